@@ -7,24 +7,43 @@ Usage: python era_upload.py <session_id> <project_directory> [api_url]
 Features:
 - Parallel uploads for faster deployment
 - Automatic exclusion of common build artifacts
+- Incremental uploads: files unchanged since the last upload are skipped
 - Progress tracking and error reporting
 - Color-coded output
 """
 
+import io
 import os
+import json
+import hashlib
 import sys
-import mimetypes
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Set
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Tuple
+
+# requests, tarfile, mimetypes, etc. are imported where they are used so
+# that printing usage doesn't pay for them
+if TYPE_CHECKING:
+    import requests
 
 # Configuration
 DEFAULT_API_URL = 'https://era-agent.yawnxyz.workers.dev'
-MAX_WORKERS = 10  # Parallel uploads
+MAX_WORKERS = 10  # Parallel uploads; main() applies ERA_UPLOAD_WORKERS
 TIMEOUT = 30  # Request timeout in seconds
 
+# Bulk uploads: small files are packed into tar batches, large files keep their own PUT
+BULK_MAX_FILES = 256  # Files per batch
+BULK_MAX_BYTES = 8 * 1024 * 1024  # Bytes per batch
+BULK_FILE_THRESHOLD = 4 * 1024 * 1024  # Files above this size are uploaded individually
+COMPRESS_LEVEL = 6  # gzip level for bulk upload bodies
+SENDFILE_THRESHOLD = 1024 * 1024  # Plain-HTTP files above this size are sent with sendfile(2)
+
+# Shared HTTP session, created on first use by get_session()
+_SESSION = None
+
+# Units for format_size, each 1024x the previous
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
 # Colors for terminal output
 class Colors:
     RED = '\033[0;31m'
@@ -33,8 +52,8 @@ class Colors:
     BLUE = '\033[0;34m'
     RESET = '\033[0m'
 
-# Patterns to exclude (these will be checked against path parts)
-EXCLUDE_PATTERNS: Set[str] = {
+# Patterns to exclude (matched against each file and directory name)
+EXCLUDE_PATTERNS: FrozenSet[str] = frozenset({
     'node_modules',
     '.git',
     '.venv',
@@ -54,127 +73,387 @@ EXCLUDE_PATTERNS: Set[str] = {
     'secrets.yaml',
     'secrets.yml',
     'credentials.json',
-}
+})
 
 # File extensions to exclude
-EXCLUDE_EXTENSIONS: Set[str] = {
+EXCLUDE_EXTENSIONS: FrozenSet[str] = frozenset({
     '.pyc',
     '.pyo',
     '.pyd',
     '.so',
     '.dylib',
     '.log',
-}
+})
+
+# Non-text content types that compress well
+COMPRESSIBLE_TYPES: FrozenSet[str] = frozenset({
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/x-sh',
+    'application/x-python-code',
+    'image/svg+xml',
+})
+
+def color_text(message: str, color: str = Colors.RESET) -> str:
+    """Wrap message in terminal color codes."""
+    return f"{color}{message}{Colors.RESET}"
 
 def print_color(message: str, color: str = Colors.RESET):
     """Print colored message to terminal."""
-    print(f"{color}{message}{Colors.RESET}")
+    print(color_text(message, color))
 
-def should_exclude(path: Path, project_dir: Path) -> bool:
-    """Check if path should be excluded based on patterns."""
-    # Check if any part of the path matches exclude patterns
-    rel_path = path.relative_to(project_dir)
-    parts = set(rel_path.parts)
+def get_session() -> 'requests.Session':
+    """
+    Get the shared HTTP session.
+    Uploads reuse its pooled keep-alive connections instead of paying a
+    TCP+TLS handshake per file. First called from main before any worker starts.
+    """
+    global _SESSION
+
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        _SESSION = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=MAX_WORKERS,
+            pool_maxsize=MAX_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        _SESSION.mount('https://', adapter)
+        _SESSION.mount('http://', adapter)
 
-    if parts & EXCLUDE_PATTERNS:
-        return True
+    return _SESSION
 
-    # Check file extension
-    if path.suffix in EXCLUDE_EXTENSIONS:
-        return True
+def get_files(project_dir: Path) -> List[Tuple[Path, int]]:
+    """
+    Get all files to upload, excluding patterns.
+    Excluded directories are pruned without being descended into.
+    Returns: list of (file_path, file_size), sized from the scan's cached stat
+    """
+    files = []
+    directories = [os.fspath(project_dir)]
 
-    # Check filename
-    if path.name in EXCLUDE_PATTERNS:
-        return True
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.name in EXCLUDE_PATTERNS:
+                    continue
 
-    return False
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file():
+                    if os.path.splitext(entry.name)[1] in EXCLUDE_EXTENSIONS:
+                        continue
+                    files.append((Path(entry.path), entry.stat().st_size))
 
-def get_files(project_dir: Path) -> List[Path]:
-    """Get all files to upload, excluding patterns."""
-    files = []
+    return files
 
-    for file_path in project_dir.rglob('*'):
-        if file_path.is_file() and not should_exclude(file_path, project_dir):
-            files.append(file_path)
+def file_digest(file_path: Path) -> str:
+    """Compute the MD5 hex digest of a file (the same value R2 reports as its etag)."""
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'md5').hexdigest()
 
-    return files
+        digest = hashlib.md5()
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+def get_remote_manifest(session_id: str, api_url: str) -> Dict[str, str]:
+    """
+    Fetch the etags of files already stored in the session.
+    Returns: {relative_path: etag}, or an empty dict if the listing is unavailable
+    """
+    try:
+        response = get_session().get(f"{api_url}/api/sessions/{session_id}/files", timeout=TIMEOUT)
+        if response.status_code != 200:
+            return {}
+        return {
+            f['path']: f['etag']
+            for f in response.json().get('files', [])
+            if f.get('etag')
+        }
+    except Exception:
+        return {}
+
+def get_changed_files(
+    files: List[Tuple[Path, int]],
+    project_dir: Path,
+    manifest: Dict[str, str]
+) -> List[Tuple[Path, int]]:
+    """Drop files whose content already matches the copy stored in the session."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    candidates = [
+        file_path for file_path, _ in files
+        if file_path.relative_to(project_dir).as_posix() in manifest
+    ]
+    if not candidates:
+        return files
+
+    # hashlib releases the GIL while hashing, so threads use multiple cores
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        digests = executor.map(file_digest, candidates)
+        unchanged = {
+            file_path for file_path, digest in zip(candidates, digests)
+            if manifest[file_path.relative_to(project_dir).as_posix()] == digest
+        }
+
+    return [(file_path, file_size) for file_path, file_size in files if file_path not in unchanged]
+
+@lru_cache(maxsize=1024)
+def get_content_type_for_suffix(suffix: str) -> str:
+    """Detect content type for a file extension."""
+    import mimetypes
+
+    content_type, _ = mimetypes.guess_type(f"file{suffix}")
+    return content_type or 'application/octet-stream'
 
 def get_content_type(file_path: Path) -> str:
     """Detect content type for file."""
-    content_type, _ = mimetypes.guess_type(str(file_path))
-    return content_type or 'application/octet-stream'
+    return get_content_type_for_suffix(file_path.suffix.lower())
+
+def is_compressible(content_type: str) -> bool:
+    """Check if content of this type is likely to shrink under gzip."""
+    return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
 
 def format_size(size_bytes: int) -> str:
     """Format file size in human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f}{unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f}TB"
+    # Each unit is 2**10 of the previous one, so the bit length picks the unit directly
+    unit = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1) if size_bytes > 0 else 0
+    return f"{size_bytes / (1 << (unit * 10)):.1f}{SIZE_UNITS[unit]}"
+
+def get_error_message(status_code: int, body: bytes) -> str:
+    """Build an error message from a failed upload response."""
+    error_msg = f"HTTP {status_code}"
+    try:
+        error_detail = json.loads(body).get('error', '')
+        if error_detail:
+            error_msg += f": {error_detail}"
+    except:
+        pass
+    return error_msg
+
+def sendfile_put(url: str, file_path: Path, file_size: int, content_type: str) -> Tuple[int, bytes]:
+    """
+    PUT a file over plain HTTP, handing the body to the kernel with sendfile(2)
+    so it goes from page cache to socket without a userspace copy.
+    Returns: (status_code, response_body)
+    """
+    import http.client
+    from urllib.parse import urlsplit
+    from requests.utils import requote_uri
+
+    parts = urlsplit(requote_uri(url))
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=TIMEOUT)
+
+    try:
+        conn.putrequest('PUT', parts.path)
+        conn.putheader('Content-Type', content_type)
+        conn.putheader('Content-Length', str(file_size))
+        conn.endheaders()
+
+        with open(file_path, 'rb') as f:
+            conn.sock.sendfile(f)
+
+        response = conn.getresponse()
+        return (response.status, response.read())
+    finally:
+        conn.close()
 
 def upload_file(
     session_id: str,
     project_dir: Path,
     file_path: Path,
+    file_size: int,
     api_url: str
 ) -> Tuple[str, bool, str, int]:
     """
     Upload a single file.
     Returns: (relative_path, success, error_message, file_size)
     """
+    import socket
+    import requests
+    from urllib.parse import quote
+
     rel_path = file_path.relative_to(project_dir)
-    url = f"{api_url}/api/sessions/{session_id}/files/{rel_path}"
+    # The server percent-decodes the path, so it is stored under the same name a bulk upload uses
+    url = f"{api_url}/api/sessions/{session_id}/files/{quote(rel_path.as_posix())}"
 
     try:
-        # Read file
-        with open(file_path, 'rb') as f:
-            content = f.read()
-
-        file_size = len(content)
-
         # Detect content type
         content_type = get_content_type(file_path)
-        headers = {'Content-Type': content_type}
+        headers = {
+            'Content-Type': content_type,
+            'Content-Length': str(file_size),
+        }
 
-        # Upload
-        response = requests.put(
-            url,
-            data=content,
-            headers=headers,
-            timeout=TIMEOUT
-        )
+        if file_size > SENDFILE_THRESHOLD and url.startswith('http://'):
+            # Zero-copy only helps without TLS, which has to encrypt in userspace
+            status_code, body = sendfile_put(url, file_path, file_size, content_type)
+        else:
+            # Upload - stream the file object so large files are never held in memory
+            with open(file_path, 'rb') as f:
+                response = get_session().put(
+                    url,
+                    data=f,
+                    headers=headers,
+                    timeout=TIMEOUT
+                )
+            status_code, body = response.status_code, response.content
 
-        if response.status_code == 200:
+        if status_code == 200:
             return (str(rel_path), True, '', file_size)
         else:
-            error_msg = f"HTTP {response.status_code}"
-            try:
-                error_detail = response.json().get('error', '')
-                if error_detail:
-                    error_msg += f": {error_detail}"
-            except:
-                pass
-            return (str(rel_path), False, error_msg, file_size)
+            return (str(rel_path), False, get_error_message(status_code, body), file_size)
 
-    except requests.exceptions.Timeout:
+    except (requests.exceptions.Timeout, socket.timeout):
         return (str(rel_path), False, "Timeout", 0)
     except Exception as e:
         return (str(rel_path), False, str(e), 0)
 
+def make_batches(files: List[Tuple[Path, int]], project_dir: Path) -> List[List[Tuple[Path, int]]]:
+    """
+    Group files into upload batches.
+    Small files are packed together; large files and paths too long for a
+    ustar header get a batch of their own and are uploaded with a plain PUT.
+    """
+    batches = []
+    current = []
+    current_size = 0
+
+    for file_path, file_size in files:
+        arcname = file_path.relative_to(project_dir).as_posix()
+
+        if file_size > BULK_FILE_THRESHOLD or len(arcname.encode('utf-8')) > 100:
+            batches.append([(file_path, file_size)])
+            continue
+
+        if current and (len(current) >= BULK_MAX_FILES or current_size + file_size > BULK_MAX_BYTES):
+            batches.append(current)
+            current = []
+            current_size = 0
+
+        current.append((file_path, file_size))
+        current_size += file_size
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+def upload_batch(
+    session_id: str,
+    project_dir: Path,
+    batch: List[Tuple[Path, int]],
+    api_url: str
+) -> List[Tuple[str, bool, str, int]]:
+    """
+    Upload a batch of files as a single tar archive.
+    Falls back to per-file uploads if the server has no bulk endpoint.
+    Returns: list of (relative_path, success, error_message, file_size)
+    """
+    import gzip
+    import requests
+    import tarfile
+
+    if len(batch) == 1:
+        file_path, file_size = batch[0]
+        return [upload_file(session_id, project_dir, file_path, file_size, api_url)]
+
+    url = f"{api_url}/api/sessions/{session_id}/files/_bulk"
+    rel_paths = [file_path.relative_to(project_dir) for file_path, _ in batch]
+
+    try:
+        buffer = io.BytesIO()
+        # dereference: symlinked files are archived with their target's content, as a plain PUT would send
+        with tarfile.open(fileobj=buffer, mode='w', format=tarfile.USTAR_FORMAT, dereference=True) as tar:
+            for (file_path, _), rel_path in zip(batch, rel_paths):
+                tar.add(file_path, arcname=rel_path.as_posix(), recursive=False)
+
+        body = buffer.getvalue()
+        headers = {'Content-Type': 'application/x-tar'}
+
+        # Source files shrink 3-5x; skip batches that are all binary assets
+        if any(is_compressible(get_content_type(file_path)) for file_path, _ in batch):
+            body = gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+            headers['Content-Encoding'] = 'gzip'
+
+        response = get_session().post(
+            url,
+            data=body,
+            headers=headers,
+            timeout=TIMEOUT
+        )
+    except requests.exceptions.Timeout:
+        return [(str(rel_path), False, "Timeout", 0) for rel_path in rel_paths]
+    except Exception as e:
+        return [(str(rel_path), False, str(e), 0) for rel_path in rel_paths]
+
+    # Servers without the bulk endpoint hand the request to the agent, which doesn't know it
+    if response.status_code in (404, 405):
+        return [
+            upload_file(session_id, project_dir, file_path, file_size, api_url)
+            for file_path, file_size in batch
+        ]
+
+    if response.status_code != 200:
+        error_msg = get_error_message(response.status_code, response.content)
+        return [(str(rel_path), False, error_msg, 0) for rel_path in rel_paths]
+
+    # A 200 from something other than the upload endpoint (e.g. a proxy error page) fails the batch
+    try:
+        stored = {f['path']: f['size'] for f in response.json().get('files', [])}
+    except Exception:
+        return [(str(rel_path), False, "Invalid bulk upload response", 0) for rel_path in rel_paths]
+
+    results = []
+    for rel_path in rel_paths:
+        arcname = rel_path.as_posix()
+        if arcname in stored:
+            results.append((str(rel_path), True, '', stored[arcname]))
+        else:
+            results.append((str(rel_path), False, "Missing from bulk upload response", 0))
+
+    return results
+
+def parse_workers(value: str) -> int:
+    """Parse ERA_UPLOAD_WORKERS; raises ValueError unless it is a positive integer."""
+    workers = int(value)
+    if workers < 1:
+        raise ValueError(value)
+    return workers
+
 def main():
+    global MAX_WORKERS
+
     # Parse arguments
     if len(sys.argv) < 3:
         print_color("ERA Agent Project Upload Script", Colors.BLUE)
         print_color("Usage: python era_upload.py <session_id> <project_directory> [api_url]", Colors.RED)
         print("\nExample: python era_upload.py my-project ./my-app")
         print("\nEnvironment variables:")
-        print("  ERA_API_URL  - Default API URL (optional)")
+        print("  ERA_API_URL         - Default API URL (optional)")
+        print("  ERA_UPLOAD_WORKERS  - Number of parallel uploads (default: 10)")
         sys.exit(1)
 
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from datetime import datetime
+
     session_id = sys.argv[1]
     project_dir = Path(sys.argv[2])
     api_url = sys.argv[3] if len(sys.argv) > 3 else os.environ.get('ERA_API_URL', DEFAULT_API_URL)
 
+    if 'ERA_UPLOAD_WORKERS' in os.environ:
+        try:
+            MAX_WORKERS = parse_workers(os.environ['ERA_UPLOAD_WORKERS'])
+        except ValueError:
+            print_color(f"Error: ERA_UPLOAD_WORKERS must be a positive integer, got '{os.environ['ERA_UPLOAD_WORKERS']}'", Colors.RED)
+            sys.exit(1)
+
     # Validate project directory
     if not project_dir.exists():
         print_color(f"Error: Directory '{project_dir}' does not exist", Colors.RED)
@@ -192,6 +471,9 @@ def main():
     print(f"API URL:     {Colors.GREEN}{api_url}{Colors.RESET}")
     print()
 
+    # Create the shared session before upload workers start using it
+    get_session()
+
     # Get files to upload
     print_color("🔍 Scanning for files...", Colors.YELLOW)
     start_time = datetime.now()
@@ -203,12 +485,29 @@ def main():
         print_color("No files to upload!", Colors.RED)
         sys.exit(1)
 
+    # Skip files that are already up to date in the session
+    manifest = get_remote_manifest(session_id, api_url)
+    if manifest:
+        files = get_changed_files(files, project_dir, manifest)
+        skipped = total_files - len(files)
+        total_files = len(files)
+
+        if skipped:
+            print_color(f"⏭️  Skipping {skipped} unchanged files", Colors.YELLOW)
+
+        if total_files == 0:
+            print_color("✨ Everything is up to date!", Colors.GREEN)
+            sys.exit(0)
+
     # Calculate total size
-    total_size = sum(f.stat().st_size for f in files)
+    total_size = sum(file_size for _, file_size in files)
 
     print_color(f"📁 Found {total_files} files ({format_size(total_size)} total)", Colors.GREEN)
     print()
 
+    # Largest first, so a big file can't start last and stretch the total time
+    files.sort(key=lambda f: f[1], reverse=True)
+
     # Upload files in parallel
     print_color("📤 Uploading files...", Colors.BLUE)
     uploaded = 0
@@ -219,26 +518,29 @@ def main():
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         # Submit all upload tasks
         futures = {
-            executor.submit(upload_file, session_id, project_dir, file_path, api_url): file_path
-            for file_path in files
+            executor.submit(upload_batch, session_id, project_dir, batch, api_url): batch
+            for batch in make_batches(files, project_dir)
         }
 
-        # Process completed uploads
+        # Process completed uploads, writing each batch's progress lines at once
         for future in as_completed(futures):
-            rel_path, success, error, file_size = future.result()
-
-            if success:
-                uploaded += 1
-                uploaded_size += file_size
-                print_color(
-                    f"✅ [{uploaded + failed}/{total_files}] {rel_path}",
-                    Colors.GREEN
-                )
-            else:
-                failed += 1
-                error_msg = f"❌ [{uploaded + failed}/{total_files}] {rel_path} ({error})"
-                print_color(error_msg, Colors.RED)
-                errors.append((rel_path, error))
+            lines = []
+            for rel_path, success, error, file_size in future.result():
+                if success:
+                    uploaded += 1
+                    uploaded_size += file_size
+                    lines.append(color_text(
+                        f"✅ [{uploaded + failed}/{total_files}] {rel_path}",
+                        Colors.GREEN
+                    ))
+                else:
+                    failed += 1
+                    error_msg = f"❌ [{uploaded + failed}/{total_files}] {rel_path} ({error})"
+                    lines.append(color_text(error_msg, Colors.RED))
+                    errors.append((rel_path, error))
+
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
 
     # Calculate duration
     duration = (datetime.now() - start_time).total_seconds()
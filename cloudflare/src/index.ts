@@ -106,13 +106,20 @@ export default {
 
       // GET /api/sessions/{id}/files/{path} - Download file
       if (subPath.startsWith('/files/') && request.method === 'GET') {
-        const filePath = subPath.replace('/files/', '');
+        const filePath = normalizeSessionFilePath(subPath.replace('/files/', ''), true);
+        if (filePath === null) return invalidFilePathResponse();
         return handleDownloadSessionFile(sessionId, filePath, env);
       }
 
+      // POST /api/sessions/{id}/files/_bulk - Upload many files as a tar archive
+      if (subPath === '/files/_bulk' && request.method === 'POST') {
+        return handleBulkUploadSessionFiles(sessionId, request, env);
+      }
+
       // PUT /api/sessions/{id}/files/{path} - Upload file
       if (subPath.startsWith('/files/') && request.method === 'PUT') {
-        const filePath = subPath.replace('/files/', '');
+        const filePath = normalizeSessionFilePath(subPath.replace('/files/', ''), true);
+        if (filePath === null) return invalidFilePathResponse();
         return handleUploadSessionFile(sessionId, filePath, request, env);
       }
 
@@ -565,13 +572,22 @@ export async function handleSessionRunStream(sessionId: string, request: Request
 
 export async function handleListSessionFiles(sessionId: string, env: Env): Promise<Response> {
   const prefix = `sessions/${sessionId}/`;
-  const listed = await env.SESSIONS_BUCKET.list({ prefix });
+  const files: { path: string; size: number; uploaded: Date; etag: string }[] = [];
 
-  const files = listed.objects.map(obj => ({
-    path: obj.key.replace(prefix, ''),
-    size: obj.size,
-    uploaded: obj.uploaded,
-  }));
+  // R2 lists at most 1000 objects per call, so follow the cursor
+  let cursor: string | undefined;
+  do {
+    const listed = await env.SESSIONS_BUCKET.list({ prefix, cursor });
+    for (const obj of listed.objects) {
+      files.push({
+        path: obj.key.replace(prefix, ''),
+        size: obj.size,
+        uploaded: obj.uploaded,
+        etag: obj.etag,
+      });
+    }
+    cursor = listed.truncated ? listed.cursor : undefined;
+  } while (cursor);
 
   return new Response(JSON.stringify({ files, count: files.length }), {
     headers: { 'Content-Type': 'application/json' },
@@ -594,9 +610,47 @@ export async function handleDownloadSessionFile(sessionId: string, filePath: str
   });
 }
 
+/**
+ * Turn a session file path into the name it is stored under, so per-file and bulk
+ * uploads agree: URL paths are percent-decoded and a leading "./" is dropped.
+ * Returns null for malformed escapes, absolute paths and ".." segments.
+ */
+function normalizeSessionFilePath(path: string, urlEncoded: boolean): string | null {
+  if (urlEncoded) {
+    try {
+      path = decodeURIComponent(path);
+    } catch {
+      return null;
+    }
+  }
+  path = path.replace(/^(\.\/)+/, '');
+
+  if (!path || path.startsWith('/') || path.split('/').includes('..')) {
+    return null;
+  }
+  return path;
+}
+
+function invalidFilePathResponse(): Response {
+  return new Response(JSON.stringify({ error: 'invalid file path' }), {
+    status: 400,
+    headers: { 'Content-Type': 'application/json' },
+  });
+}
+
+/**
+ * Read an upload body, decoding it if the client sent it gzip-compressed.
+ */
+async function readUploadBody(request: Request): Promise<ArrayBuffer> {
+  if (request.headers.get('Content-Encoding') === 'gzip' && request.body) {
+    return new Response(request.body.pipeThrough(new DecompressionStream('gzip'))).arrayBuffer();
+  }
+  return request.arrayBuffer();
+}
+
 export async function handleUploadSessionFile(sessionId: string, filePath: string, request: Request, env: Env): Promise<Response> {
   const key = `sessions/${sessionId}/${filePath}`;
-  const content = await request.arrayBuffer();
+  const content = await readUploadBody(request);
 
   await env.SESSIONS_BUCKET.put(key, content);
 
@@ -608,6 +662,84 @@ export async function handleUploadSessionFile(sessionId: string, filePath: strin
   });
 }
 
+/**
+ * Split an uncompressed ustar archive into its regular-file entries.
+ * Throws if an entry's path is absolute or escapes the session with "..".
+ */
+function parseTarEntries(buffer: ArrayBuffer): { path: string; content: Uint8Array }[] {
+  const bytes = new Uint8Array(buffer);
+  const decoder = new TextDecoder();
+  const entries: { path: string; content: Uint8Array }[] = [];
+
+  const readField = (header: Uint8Array, start: number, length: number): string => {
+    const field = header.subarray(start, start + length);
+    const end = field.indexOf(0);
+    return decoder.decode(end === -1 ? field : field.subarray(0, end));
+  };
+
+  let offset = 0;
+  while (offset + 512 <= bytes.length) {
+    const header = bytes.subarray(offset, offset + 512);
+    // Two zero blocks mark the end of the archive
+    if (header.every(b => b === 0)) {
+      break;
+    }
+
+    const name = readField(header, 0, 100);
+    const size = parseInt(readField(header, 124, 12).trim() || '0', 8);
+    const type = readField(header, 156, 1);
+    const prefix = readField(header, 345, 155);
+    offset += 512;
+
+    // Only regular files are stored; directories and links are skipped
+    if (type === '0' || type === '') {
+      const rawPath = prefix ? `${prefix}/${name}` : name;
+      const path = normalizeSessionFilePath(rawPath, false);
+      if (path === null) {
+        throw new Error(`invalid file path in archive: ${rawPath}`);
+      }
+      entries.push({ path, content: bytes.slice(offset, offset + size) });
+    }
+
+    offset += Math.ceil(size / 512) * 512;
+  }
+
+  return entries;
+}
+
+export async function handleBulkUploadSessionFiles(sessionId: string, request: Request, env: Env): Promise<Response> {
+  const contentType = request.headers.get('Content-Type') || '';
+  if (!contentType.startsWith('application/x-tar')) {
+    return new Response(JSON.stringify({ error: 'Content-Type must be application/x-tar' }), {
+      status: 415,
+      headers: { 'Content-Type': 'application/json' },
+    });
+  }
+
+  let entries: { path: string; content: Uint8Array }[];
+  try {
+    entries = parseTarEntries(await readUploadBody(request));
+  } catch (error) {
+    return new Response(JSON.stringify({ error: error instanceof Error ? error.message : String(error) }), {
+      status: 400,
+      headers: { 'Content-Type': 'application/json' },
+    });
+  }
+
+  await Promise.all(entries.map(entry =>
+    env.SESSIONS_BUCKET.put(`sessions/${sessionId}/${entry.path}`, entry.content)
+  ));
+
+  const files = entries.map(entry => ({
+    path: entry.path,
+    size: entry.content.byteLength,
+  }));
+
+  return new Response(JSON.stringify({ files, count: files.length }), {
+    headers: { 'Content-Type': 'application/json' },
+  });
+}
+
 async function handleUpdateSessionCode(sessionId: string, request: Request, env: Env): Promise<Response> {
   const id = env.SESSIONS.idFromName(sessionId);
   const stub = env.SESSIONS.get(id);
@@ -1019,7 +1151,23 @@ async function handleStorageProxyRequest(request: Request, env: Env): Promise<Re
     });
   }
 
-  const [, type, namespace, key] = match;
+  const [, type, rawNamespace, rawKey] = match;
+
+  // Clients percent-encode namespaces and keys that contain reserved characters
+  let namespace: string;
+  let key: string | undefined;
+  try {
+    namespace = decodeURIComponent(rawNamespace);
+    key = rawKey && decodeURIComponent(rawKey);
+  } catch {
+    return new Response(JSON.stringify({
+      error: 'invalid percent-encoding in storage path',
+      hint: 'Encode namespaces and keys with encodeURIComponent'
+    }), {
+      status: 400,
+      headers: { 'Content-Type': 'application/json' },
+    });
+  }
 
   try {
     if (type === 'kv') {
@@ -6,6 +6,9 @@
 // Get storage URL from environment
 const STORAGE_URL = process.env.ERA_STORAGE_URL || 'http://localhost';
 
+// Percent-encode each segment of a key for use in a request path (namespaces use encodeURIComponent)
+const encodeKey = (key) => key.split('/').map(encodeURIComponent).join('/');
+
 /**
  * Key-Value storage interface
  */
@@ -19,7 +22,7 @@ class KVStorage {
    * @returns {Promise<boolean>}
    */
   static async set(namespace, key, value, metadata = null) {
-    const url = `${STORAGE_URL}/api/storage/kv/${namespace}/${key}`;
+    const url = `${STORAGE_URL}/api/storage/kv/${encodeURIComponent(namespace)}/${encodeKey(key)}`;
 
     const response = await fetch(url, {
       method: 'PUT',
@@ -43,7 +46,7 @@ class KVStorage {
    * @returns {Promise<string|null>}
    */
   static async get(namespace, key) {
-    const url = `${STORAGE_URL}/api/storage/kv/${namespace}/${key}`;
+    const url = `${STORAGE_URL}/api/storage/kv/${encodeURIComponent(namespace)}/${encodeKey(key)}`;
 
     const response = await fetch(url);
 
@@ -67,7 +70,7 @@ class KVStorage {
    * @returns {Promise<boolean>}
    */
   static async delete(namespace, key) {
-    const url = `${STORAGE_URL}/api/storage/kv/${namespace}/${key}`;
+    const url = `${STORAGE_URL}/api/storage/kv/${encodeURIComponent(namespace)}/${encodeKey(key)}`;
 
     const response = await fetch(url, { method: 'DELETE' });
 
@@ -88,7 +91,7 @@ class KVStorage {
    * @returns {Promise<Array>}
    */
   static async list(namespace, prefix = '', limit = 100) {
-    const url = `${STORAGE_URL}/api/storage/kv/${namespace}?prefix=${encodeURIComponent(prefix)}&limit=${limit}`;
+    const url = `${STORAGE_URL}/api/storage/kv/${encodeURIComponent(namespace)}?prefix=${encodeURIComponent(prefix)}&limit=${limit}`;
 
     const response = await fetch(url);
 
@@ -114,7 +117,7 @@ class D1Storage {
    * @returns {Promise<Array>}
    */
   static async query(namespace, sql, params = []) {
-    const url = `${STORAGE_URL}/api/storage/d1/${namespace}/query`;
+    const url = `${STORAGE_URL}/api/storage/d1/${encodeURIComponent(namespace)}/query`;
 
     const response = await fetch(url, {
       method: 'POST',
@@ -139,7 +142,7 @@ class D1Storage {
    * @returns {Promise<Object>}
    */
   static async exec(namespace, sql, params = []) {
-    const url = `${STORAGE_URL}/api/storage/d1/${namespace}/exec`;
+    const url = `${STORAGE_URL}/api/storage/d1/${encodeURIComponent(namespace)}/exec`;
 
     const response = await fetch(url, {
       method: 'POST',
@@ -169,7 +172,7 @@ class R2Storage {
    * @returns {Promise<boolean>}
    */
   static async put(namespace, key, content, metadata = null) {
-    const url = `${STORAGE_URL}/api/storage/r2/${namespace}/${key}`;
+    const url = `${STORAGE_URL}/api/storage/r2/${encodeURIComponent(namespace)}/${encodeKey(key)}`;
 
     // Convert content to base64
     let contentB64;
@@ -205,7 +208,7 @@ class R2Storage {
    * @returns {Promise<Buffer|null>}
    */
   static async get(namespace, key) {
-    const url = `${STORAGE_URL}/api/storage/r2/${namespace}/${key}`;
+    const url = `${STORAGE_URL}/api/storage/r2/${encodeURIComponent(namespace)}/${encodeKey(key)}`;
 
     const response = await fetch(url);
 
@@ -232,7 +235,7 @@ class R2Storage {
    * @returns {Promise<boolean>}
    */
   static async delete(namespace, key) {
-    const url = `${STORAGE_URL}/api/storage/r2/${namespace}/${key}`;
+    const url = `${STORAGE_URL}/api/storage/r2/${encodeURIComponent(namespace)}/${encodeKey(key)}`;
 
     const response = await fetch(url, { method: 'DELETE' });
 
@@ -253,7 +256,7 @@ class R2Storage {
    * @returns {Promise<Array>}
    */
   static async list(namespace, prefix = '', limit = 100) {
-    const url = `${STORAGE_URL}/api/storage/r2/${namespace}?prefix=${encodeURIComponent(prefix)}&limit=${limit}`;
+    const url = `${STORAGE_URL}/api/storage/r2/${encodeURIComponent(namespace)}?prefix=${encodeURIComponent(prefix)}&limit=${limit}`;
 
     const response = await fetch(url);
 
@@ -5,77 +5,163 @@ ERA Storage SDK for Python
 Provides easy access to KV, D1, R2 storage from sandboxed code
 """
 
+import io
 import os
 import json
-import base64
-from typing import Any, Dict, List, Optional
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+import threading
+from functools import lru_cache
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+
+# Use orjson when the sandbox has it; it parses and serializes several times faster
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
 # Get storage URL from environment
 STORAGE_URL = os.getenv('ERA_STORAGE_URL', 'http://localhost')
 
+_STORAGE = urlsplit(STORAGE_URL)
+_BASE_PATH = _STORAGE.path.rstrip('/')
+
+# One keep-alive connection per thread, reused across calls
+_local = threading.local()
+
+# Read size when streaming a response into a file
+_CHUNK_SIZE = 65536
+
+
+def _request(method: str, path: str, body: Optional[bytes] = None,
+             headers: Optional[Dict[str, str]] = None,
+             dst: Optional[BinaryIO] = None) -> Tuple[int, bytes]:
+    """
+    Send a request to the storage proxy and return (status, body).
+    If dst is given, a successful response body is streamed into it and b'' is returned.
+    """
+    conn = getattr(_local, 'conn', None)
+    reused = conn is not None
+
+    while True:
+        if conn is None:
+            connection_class = HTTPSConnection if _STORAGE.scheme == 'https' else HTTPConnection
+            conn = connection_class(_STORAGE.hostname, _STORAGE.port)
+            _local.conn = conn
+
+        try:
+            conn.request(method, _BASE_PATH + path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            break
+        except (HTTPException, ConnectionError):
+            conn.close()
+            conn = _local.conn = None
+            # The server may have closed an idle keep-alive connection; retry once on a fresh one
+            if not reused:
+                raise
+            reused = False
+
+    try:
+        if dst is None or response.status >= 400:
+            return response.status, response.read()
+
+        while True:
+            chunk = response.read(_CHUNK_SIZE)
+            if not chunk:
+                return response.status, b''
+            dst.write(chunk)
+    except BaseException:
+        # A partially read response leaves the connection unusable
+        conn.close()
+        _local.conn = None
+        raise
+
+
+@lru_cache(maxsize=4096)
+def _quote(value: str, safe: str = '') -> str:
+    """URL-quote a namespace or key for use in a request path"""
+    return quote(value, safe=safe)
+
+
+def _raise_for_status(status: int, body: bytes, operation: str) -> None:
+    """Raise with the proxy's error message if the request failed"""
+    if status < 400:
+        return
+    try:
+        error = _loads(body).get('error')
+    except ValueError:
+        error = None
+    raise Exception(f"{operation} failed: {error or f'HTTP {status}'}")
+
+
 class KVStorage:
     """Key-Value storage interface"""
 
     @staticmethod
     def set(namespace: str, key: str, value: str, metadata: Optional[Dict] = None) -> bool:
         """Set a key-value pair"""
-        url = f"{STORAGE_URL}/api/storage/kv/{namespace}/{key}"
-        data = json.dumps({"value": value, "metadata": metadata}).encode('utf-8')
+        path = f"/api/storage/kv/{_quote(namespace)}/{_quote(key, '/')}"
+        data = _dumps({"value": value, "metadata": metadata})
 
-        req = Request(url, data=data, method='PUT')
-        req.add_header('Content-Type', 'application/json')
-
-        try:
-            with urlopen(req) as response:
-                result = json.loads(response.read())
-                return result.get('success', False)
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"KV set failed: {error_data.get('error', str(e))}")
+        status, body = _request('PUT', path, data, {'Content-Type': 'application/json'})
+        _raise_for_status(status, body, "KV set")
+        return _loads(body).get('success', False)
 
     @staticmethod
     def get(namespace: str, key: str) -> Optional[str]:
         """Get a value by key"""
-        url = f"{STORAGE_URL}/api/storage/kv/{namespace}/{key}"
+        path = f"/api/storage/kv/{_quote(namespace)}/{_quote(key, '/')}"
 
-        try:
-            with urlopen(url) as response:
-                result = json.loads(response.read())
-                return result.get('value')
-        except HTTPError as e:
-            if e.code == 404:
-                return None
-            error_data = json.loads(e.read())
-            raise Exception(f"KV get failed: {error_data.get('error', str(e))}")
+        status, body = _request('GET', path)
+        if status == 404:
+            return None
+        _raise_for_status(status, body, "KV get")
+        return _loads(body).get('value')
 
     @staticmethod
     def delete(namespace: str, key: str) -> bool:
         """Delete a key"""
-        url = f"{STORAGE_URL}/api/storage/kv/{namespace}/{key}"
-        req = Request(url, method='DELETE')
+        path = f"/api/storage/kv/{_quote(namespace)}/{_quote(key, '/')}"
 
-        try:
-            with urlopen(req) as response:
-                result = json.loads(response.read())
-                return result.get('success', False)
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"KV delete failed: {error_data.get('error', str(e))}")
+        status, body = _request('DELETE', path)
+        _raise_for_status(status, body, "KV delete")
+        return _loads(body).get('success', False)
 
     @staticmethod
     def list(namespace: str, prefix: str = "", limit: int = 100) -> List[Dict]:
         """List keys in a namespace"""
-        url = f"{STORAGE_URL}/api/storage/kv/{namespace}?prefix={prefix}&limit={limit}"
+        path = f"/api/storage/kv/{_quote(namespace)}?" + urlencode({"prefix": prefix, "limit": limit})
 
-        try:
-            with urlopen(url) as response:
-                result = json.loads(response.read())
-                return result.get('keys', [])
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"KV list failed: {error_data.get('error', str(e))}")
+        status, body = _request('GET', path)
+        _raise_for_status(status, body, "KV list")
+        return _loads(body).get('keys', [])
+
+    @staticmethod
+    def multi_set(namespace: str, items: Dict[str, str], metadata: Optional[Dict] = None) -> bool:
+        """Set several key-value pairs in one request"""
+        path = f"/api/storage/kv/{_quote(namespace)}"
+        data = _dumps({
+            "set": [{"key": key, "value": value, "metadata": metadata} for key, value in items.items()]
+        })
+
+        status, body = _request('POST', path, data, {'Content-Type': 'application/json'})
+        _raise_for_status(status, body, "KV multi_set")
+        return _loads(body).get('success', False)
+
+    @staticmethod
+    def multi_get(namespace: str, keys: List[str]) -> Dict[str, Optional[str]]:
+        """Get several values in one request (missing keys map to None)"""
+        path = f"/api/storage/kv/{_quote(namespace)}"
+        data = _dumps({"get": list(keys)})
+
+        status, body = _request('POST', path, data, {'Content-Type': 'application/json'})
+        _raise_for_status(status, body, "KV multi_get")
+        return _loads(body).get('values', {})
 
 
 class D1Storage:
@@ -84,35 +170,34 @@ class D1Storage:
     @staticmethod
     def query(namespace: str, sql: str, params: Optional[List] = None) -> List[Dict]:
         """Execute a SELECT query and return results"""
-        url = f"{STORAGE_URL}/api/storage/d1/{namespace}/query"
-        data = json.dumps({"sql": sql, "params": params or []}).encode('utf-8')
-
-        req = Request(url, data=data, method='POST')
-        req.add_header('Content-Type', 'application/json')
+        path = f"/api/storage/d1/{_quote(namespace)}/query"
+        data = _dumps({"sql": sql, "params": params or []})
 
-        try:
-            with urlopen(req) as response:
-                result = json.loads(response.read())
-                return result.get('results', [])
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"D1 query failed: {error_data.get('error', str(e))}")
+        status, body = _request('POST', path, data, {'Content-Type': 'application/json'})
+        _raise_for_status(status, body, "D1 query")
+        return _loads(body).get('results', [])
 
     @staticmethod
     def exec(namespace: str, sql: str, params: Optional[List] = None) -> Dict:
         """Execute a statement (INSERT, UPDATE, DELETE, CREATE TABLE, etc.)"""
-        url = f"{STORAGE_URL}/api/storage/d1/{namespace}/exec"
-        data = json.dumps({"sql": sql, "params": params or []}).encode('utf-8')
+        path = f"/api/storage/d1/{_quote(namespace)}/exec"
+        data = _dumps({"sql": sql, "params": params or []})
 
-        req = Request(url, data=data, method='POST')
-        req.add_header('Content-Type', 'application/json')
+        status, body = _request('POST', path, data, {'Content-Type': 'application/json'})
+        _raise_for_status(status, body, "D1 exec")
+        return _loads(body)
 
-        try:
-            with urlopen(req) as response:
-                return json.loads(response.read())
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"D1 exec failed: {error_data.get('error', str(e))}")
+    @staticmethod
+    def batch(namespace: str, statements: List[Tuple[str, Optional[List]]]) -> List[Dict]:
+        """Execute several statements in one request and transaction; returns one result per statement"""
+        path = f"/api/storage/d1/{_quote(namespace)}/batch"
+        data = _dumps({
+            "batch": [{"sql": sql, "params": params or []} for sql, params in statements]
+        })
+
+        status, body = _request('POST', path, data, {'Content-Type': 'application/json'})
+        _raise_for_status(status, body, "D1 batch")
+        return _loads(body).get('results', [])
 
 
 class R2Storage:
@@ -121,67 +206,53 @@ class R2Storage:
     @staticmethod
     def put(namespace: str, key: str, content: bytes, metadata: Optional[Dict[str, str]] = None) -> bool:
         """Store an object"""
-        url = f"{STORAGE_URL}/api/storage/r2/{namespace}/{key}"
+        path = f"/api/storage/r2/{_quote(namespace)}/{_quote(key, '/')}"
 
-        # Encode content as base64 for JSON transport
-        content_b64 = base64.b64encode(content).decode('ascii')
-        data = json.dumps({"content": content_b64, "metadata": metadata}).encode('utf-8')
+        # Send raw bytes; metadata travels JSON-encoded in a header
+        headers = {'Content-Type': 'application/octet-stream'}
+        if metadata:
+            headers['X-Era-Metadata'] = json.dumps(metadata)
 
-        req = Request(url, data=data, method='PUT')
-        req.add_header('Content-Type', 'application/json')
-
-        try:
-            with urlopen(req) as response:
-                result = json.loads(response.read())
-                return result.get('success', False)
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"R2 put failed: {error_data.get('error', str(e))}")
+        status, body = _request('PUT', path, content, headers)
+        _raise_for_status(status, body, "R2 put")
+        return _loads(body).get('success', False)
 
     @staticmethod
     def get(namespace: str, key: str) -> Optional[bytes]:
         """Retrieve an object"""
-        url = f"{STORAGE_URL}/api/storage/r2/{namespace}/{key}"
+        buffer = io.BytesIO()
+        if not R2Storage.download(namespace, key, buffer):
+            return None
+        return buffer.getvalue()
 
-        try:
-            with urlopen(url) as response:
-                result = json.loads(response.read())
-                content_b64 = result.get('content')
-                if content_b64:
-                    return base64.b64decode(content_b64)
-                return None
-        except HTTPError as e:
-            if e.code == 404:
-                return None
-            error_data = json.loads(e.read())
-            raise Exception(f"R2 get failed: {error_data.get('error', str(e))}")
+    @staticmethod
+    def download(namespace: str, key: str, dst: BinaryIO) -> bool:
+        """Stream an object into a writable binary file; returns False if it doesn't exist"""
+        path = f"/api/storage/r2/{_quote(namespace)}/{_quote(key, '/')}"
+
+        status, body = _request('GET', path, headers={'Accept': 'application/octet-stream'}, dst=dst)
+        if status == 404:
+            return False
+        _raise_for_status(status, body, "R2 download")
+        return True
 
     @staticmethod
     def delete(namespace: str, key: str) -> bool:
         """Delete an object"""
-        url = f"{STORAGE_URL}/api/storage/r2/{namespace}/{key}"
-        req = Request(url, method='DELETE')
+        path = f"/api/storage/r2/{_quote(namespace)}/{_quote(key, '/')}"
 
-        try:
-            with urlopen(req) as response:
-                result = json.loads(response.read())
-                return result.get('success', False)
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"R2 delete failed: {error_data.get('error', str(e))}")
+        status, body = _request('DELETE', path)
+        _raise_for_status(status, body, "R2 delete")
+        return _loads(body).get('success', False)
 
     @staticmethod
     def list(namespace: str, prefix: str = "", limit: int = 100) -> List[Dict]:
         """List objects in a namespace"""
-        url = f"{STORAGE_URL}/api/storage/r2/{namespace}?prefix={prefix}&limit={limit}"
+        path = f"/api/storage/r2/{_quote(namespace)}?" + urlencode({"prefix": prefix, "limit": limit})
 
-        try:
-            with urlopen(url) as response:
-                result = json.loads(response.read())
-                return result.get('objects', [])
-        except HTTPError as e:
-            error_data = json.loads(e.read())
-            raise Exception(f"R2 list failed: {error_data.get('error', str(e))}")
+        status, body = _request('GET', path)
+        _raise_for_status(status, body, "R2 list")
+        return _loads(body).get('objects', [])
 
 
 # Convenience instances
@@ -198,12 +269,15 @@ export const JAVASCRIPT_SDK = `/**
 // Get storage URL from environment
 const STORAGE_URL = process.env.ERA_STORAGE_URL || 'http://localhost';
 
+// Percent-encode each segment of a key for use in a request path (namespaces use encodeURIComponent)
+const encodeKey = (key) => key.split('/').map(encodeURIComponent).join('/');
+
 /**
  * Key-Value storage interface
  */
 class KVStorage {
   static async set(namespace, key, value, metadata = null) {
-    const url = \`\${STORAGE_URL}/api/storage/kv/\${namespace}/\${key}\`;
+    const url = \`\${STORAGE_URL}/api/storage/kv/\${encodeURIComponent(namespace)}/\${encodeKey(key)}\`;
 
     const response = await fetch(url, {
       method: 'PUT',
@@ -221,7 +295,7 @@ class KVStorage {
   }
 
   static async get(namespace, key) {
-    const url = \`\${STORAGE_URL}/api/storage/kv/\${namespace}/\${key}\`;
+    const url = \`\${STORAGE_URL}/api/storage/kv/\${encodeURIComponent(namespace)}/\${encodeKey(key)}\`;
 
     const response = await fetch(url);
 
@@ -239,7 +313,7 @@ class KVStorage {
   }
 
   static async delete(namespace, key) {
-    const url = \`\${STORAGE_URL}/api/storage/kv/\${namespace}/\${key}\`;
+    const url = \`\${STORAGE_URL}/api/storage/kv/\${encodeURIComponent(namespace)}/\${encodeKey(key)}\`;
 
     const response = await fetch(url, { method: 'DELETE' });
 
@@ -253,7 +327,7 @@ class KVStorage {
   }
 
   static async list(namespace, prefix = '', limit = 100) {
-    const url = \`\${STORAGE_URL}/api/storage/kv/\${namespace}?prefix=\${encodeURIComponent(prefix)}&limit=\${limit}\`;
+    const url = \`\${STORAGE_URL}/api/storage/kv/\${encodeURIComponent(namespace)}?prefix=\${encodeURIComponent(prefix)}&limit=\${limit}\`;
 
     const response = await fetch(url);
 
@@ -272,7 +346,7 @@ class KVStorage {
  */
 class D1Storage {
   static async query(namespace, sql, params = []) {
-    const url = \`\${STORAGE_URL}/api/storage/d1/\${namespace}/query\`;
+    const url = \`\${STORAGE_URL}/api/storage/d1/\${encodeURIComponent(namespace)}/query\`;
 
     const response = await fetch(url, {
       method: 'POST',
@@ -290,7 +364,7 @@ class D1Storage {
   }
 
   static async exec(namespace, sql, params = []) {
-    const url = \`\${STORAGE_URL}/api/storage/d1/\${namespace}/exec\`;
+    const url = \`\${STORAGE_URL}/api/storage/d1/\${encodeURIComponent(namespace)}/exec\`;
 
     const response = await fetch(url, {
       method: 'POST',
@@ -312,7 +386,7 @@ class D1Storage {
  */
 class R2Storage {
   static async put(namespace, key, content, metadata = null) {
-    const url = \`\${STORAGE_URL}/api/storage/r2/\${namespace}/\${key}\`;
+    const url = \`\${STORAGE_URL}/api/storage/r2/\${encodeURIComponent(namespace)}/\${encodeKey(key)}\`;
 
     // Convert content to base64
     let contentB64;
@@ -342,7 +416,7 @@ class R2Storage {
   }
 
   static async get(namespace, key) {
-    const url = \`\${STORAGE_URL}/api/storage/r2/\${namespace}/\${key}\`;
+    const url = \`\${STORAGE_URL}/api/storage/r2/\${encodeURIComponent(namespace)}/\${encodeKey(key)}\`;
 
     const response = await fetch(url);
 
@@ -363,7 +437,7 @@ class R2Storage {
   }
 
   static async delete(namespace, key) {
-    const url = \`\${STORAGE_URL}/api/storage/r2/\${namespace}/\${key}\`;
+    const url = \`\${STORAGE_URL}/api/storage/r2/\${encodeURIComponent(namespace)}/\${encodeKey(key)}\`;
 
     const response = await fetch(url, { method: 'DELETE' });
 
@@ -377,7 +451,7 @@ class R2Storage {
   }
 
   static async list(namespace, prefix = '', limit = 100) {
-    const url = \`\${STORAGE_URL}/api/storage/r2/\${namespace}?prefix=\${encodeURIComponent(prefix)}&limit=\${limit}\`;
+    const url = \`\${STORAGE_URL}/api/storage/r2/\${encodeURIComponent(namespace)}?prefix=\${encodeURIComponent(prefix)}&limit=\${limit}\`;
 
     const response = await fetch(url);
 
@@ -9,6 +9,7 @@ import { ResourceMetadata } from './storage-registry';
  * PUT    /api/storage/kv/:namespace/:key - Set value
  * DELETE /api/storage/kv/:namespace/:key - Delete value
  * GET    /api/storage/kv/:namespace - List keys (with ?prefix=)
+ * POST   /api/storage/kv/:namespace - Batch: {"get": [keys]} or {"set": [{key, value, metadata}]}
  */
 export async function handleKVOperation(
   namespace: string,
@@ -44,6 +45,50 @@ export async function handleKVOperation(
     });
   }
 
+  // Batch get/set in one round trip
+  if (!key && request.method === 'POST') {
+    const body = await request.json() as {
+      get?: string[];
+      set?: { key: string; value: string; metadata?: any }[];
+    };
+
+    if (body.get) {
+      const values = await Promise.all(
+        body.get.map(k => env.ERA_KV.get(`${namespace}:${k}`, { type: 'text' }))
+      );
+
+      return new Response(JSON.stringify({
+        values: Object.fromEntries(body.get.map((k, i) => [k, values[i]])),
+      }), {
+        headers: { 'Content-Type': 'application/json' },
+      });
+    }
+
+    if (body.set) {
+      await Promise.all(body.set.map(async item => {
+        await env.ERA_KV.put(`${namespace}:${item.key}`, item.value, { metadata: item.metadata });
+        await registerResource(env, {
+          type: 'kv',
+          namespace,
+          key: item.key,
+          size: new Blob([item.value]).size,
+          metadata: item.metadata,
+          created_at: '',
+          updated_at: '',
+        });
+      }));
+
+      return new Response(JSON.stringify({ success: true, count: body.set.length }), {
+        headers: { 'Content-Type': 'application/json' },
+      });
+    }
+
+    return new Response(JSON.stringify({ error: 'Batch requires "get" or "set"' }), {
+      status: 400,
+      headers: { 'Content-Type': 'application/json' },
+    });
+  }
+
   if (!key) {
     return new Response(JSON.stringify({ error: 'Key required' }), {
       status: 400,
@@ -113,6 +158,7 @@ export async function handleKVOperation(
  * Handle D1 operations
  * POST /api/storage/d1/:namespace/query - Execute query
  * POST /api/storage/d1/:namespace/exec  - Execute statement (no results)
+ * POST /api/storage/d1/:namespace/batch - Execute {"batch": [{sql, params}]} in one transaction
  */
 export async function handleD1Operation(
   namespace: string,
@@ -127,11 +173,36 @@ export async function handleD1Operation(
     });
   }
 
-  const { sql, params } = await request.json() as { sql: string; params?: any[] };
-
   try {
-    // Prefix table names with namespace
-    const namespacedSql = sql.replace(/\b(FROM|JOIN|INTO|TABLE)\s+(\w+)/gi, `$1 ${namespace}_$2`);
+    if (operation === 'batch') {
+      const { batch } = await request.json() as { batch: { sql: string; params?: any[] }[] };
+      const statements = batch.map(stmt => ({
+        sql: namespaceSql(stmt.sql, namespace),
+        params: stmt.params || [],
+      }));
+
+      const results = await env.ERA_D1.batch(
+        statements.map(stmt => env.ERA_D1.prepare(stmt.sql).bind(...stmt.params))
+      );
+
+      for (const stmt of statements) {
+        await registerCreatedTable(env, namespace, stmt.sql);
+      }
+
+      return new Response(JSON.stringify({
+        success: true,
+        results: results.map(result => ({
+          success: result.success,
+          results: result.results,
+          meta: result.meta,
+        })),
+      }), {
+        headers: { 'Content-Type': 'application/json' },
+      });
+    }
+
+    const { sql, params } = await request.json() as { sql: string; params?: any[] };
+    const namespacedSql = namespaceSql(sql, namespace);
 
     if (operation === 'query') {
       const result = await env.ERA_D1.prepare(namespacedSql).bind(...(params || [])).all();
@@ -146,19 +217,7 @@ export async function handleD1Operation(
     } else if (operation === 'exec') {
       const result = await env.ERA_D1.prepare(namespacedSql).bind(...(params || [])).run();
 
-      // Register table if CREATE TABLE
-      if (namespacedSql.toUpperCase().includes('CREATE TABLE')) {
-        const match = namespacedSql.match(/CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)/i);
-        if (match) {
-          await registerResource(env, {
-            type: 'd1',
-            namespace,
-            key: match[1],
-            created_at: '',
-            updated_at: '',
-          });
-        }
-      }
+      await registerCreatedTable(env, namespace, namespacedSql);
 
       return new Response(JSON.stringify({
         success: true,
@@ -190,6 +249,10 @@ export async function handleD1Operation(
  * PUT    /api/storage/r2/:namespace/:key - Put object
  * DELETE /api/storage/r2/:namespace/:key - Delete object
  * GET    /api/storage/r2/:namespace - List objects (with ?prefix=)
+ *
+ * Objects are sent as base64 inside JSON by default. Clients that send a
+ * non-JSON body on PUT, or `Accept: application/octet-stream` on GET, transfer
+ * raw bytes instead, with metadata JSON-encoded in the X-Era-Metadata header.
  */
 export async function handleR2Operation(
   namespace: string,
@@ -246,6 +309,17 @@ export async function handleR2Operation(
       });
     }
 
+    // Return raw bytes to clients that ask for them
+    if (request.headers.get('Accept') === 'application/octet-stream') {
+      return new Response(object.body, {
+        headers: {
+          'Content-Type': 'application/octet-stream',
+          'Content-Length': object.size.toString(),
+          'X-Era-Metadata': JSON.stringify(object.customMetadata || {}),
+        },
+      });
+    }
+
     // Return as base64 for JSON transport
     const arrayBuffer = await object.arrayBuffer();
     const base64 = btoa(String.fromCharCode(...new Uint8Array(arrayBuffer)));
@@ -262,16 +336,27 @@ export async function handleR2Operation(
 
   // PUT - Write object
   if (request.method === 'PUT') {
-    const { content, metadata } = await request.json() as {
-      content: string; // base64 encoded
-      metadata?: Record<string, string>;
-    };
-
-    // Decode base64
-    const binary = atob(content);
-    const bytes = new Uint8Array(binary.length);
-    for (let i = 0; i < binary.length; i++) {
-      bytes[i] = binary.charCodeAt(i);
+    let bytes: Uint8Array;
+    let metadata: Record<string, string> | undefined;
+
+    if ((request.headers.get('Content-Type') || '').startsWith('application/json')) {
+      const body = await request.json() as {
+        content: string; // base64 encoded
+        metadata?: Record<string, string>;
+      };
+
+      // Decode base64
+      const binary = atob(body.content);
+      bytes = new Uint8Array(binary.length);
+      for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+      }
+      metadata = body.metadata;
+    } else {
+      // Raw binary body
+      bytes = new Uint8Array(await request.arrayBuffer());
+      const metadataHeader = request.headers.get('X-Era-Metadata');
+      metadata = metadataHeader ? JSON.parse(metadataHeader) : undefined;
     }
 
     await env.ERA_R2.put(fullKey, bytes, {
@@ -312,6 +397,29 @@ export async function handleR2Operation(
   });
 }
 
+// Prefix table names with namespace
+function namespaceSql(sql: string, namespace: string): string {
+  return sql.replace(/\b(FROM|JOIN|INTO|TABLE)\s+(\w+)/gi, `$1 ${namespace}_$2`);
+}
+
+// Register table if the statement is a CREATE TABLE
+async function registerCreatedTable(env: Env, namespace: string, namespacedSql: string): Promise<void> {
+  if (!namespacedSql.toUpperCase().includes('CREATE TABLE')) {
+    return;
+  }
+
+  const match = namespacedSql.match(/CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)/i);
+  if (match) {
+    await registerResource(env, {
+      type: 'd1',
+      namespace,
+      key: match[1],
+      created_at: '',
+      updated_at: '',
+    });
+  }
+}
+
 // Helper functions to interact with registry
 async function registerResource(env: Env, resource: ResourceMetadata): Promise<void> {
   try {
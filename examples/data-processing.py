@@ -6,20 +6,40 @@ Demonstrates working with lists, dictionaries, and JSON
 
 import json
 
+# orjson serializes several times faster than the json module; use it when it's installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Use NumPy's vectorized operations when it's installed; fall back to plain lists otherwise
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Process a list of numbers
 numbers = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
 print(f"Original numbers: {numbers}")
 
-# Calculate squares
-squared = [n**2 for n in numbers]
-print(f"Squared: {squared}")
+if np is not None:
+    arr = np.asarray(numbers, dtype=np.int64)
+    squares = arr * arr
 
-# Calculate sum
-total = sum(squared)
-print(f"Sum of squares: {total}")
+    # Convert back to Python values only for printing and JSON output
+    squared = squares.tolist()
+    total = int(squares.sum())
+    evens = arr[(arr & 1) == 0].tolist()
+    statistics = {"min": int(arr.min()), "max": int(arr.max()), "avg": float(arr.mean())}
+else:
+    # Calculate squares (n * n avoids the generic power path of n**2)
+    squared = [n * n for n in numbers]
+    total = sum(squared)
+    evens = [n for n in numbers if not n & 1]
+    statistics = {"min": min(numbers), "max": max(numbers), "avg": sum(numbers) / len(numbers)}
 
-# Filter even numbers
-evens = [n for n in numbers if n % 2 == 0]
+print(f"Squared: {squared}")
+print(f"Sum of squares: {total}")
 print(f"Even numbers: {evens}")
 
 # Create a result object
@@ -28,13 +48,12 @@ result = {
     "count": len(numbers),
     "sum_of_squares": total,
     "even_numbers": evens,
-    "statistics": {
-        "min": min(numbers),
-        "max": max(numbers),
-        "avg": sum(numbers) / len(numbers)
-    }
+    "statistics": statistics
 }
 
 # Output as JSON
 print("\nResult as JSON:")
-print(json.dumps(result, indent=2))
+if orjson is not None:
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
+else:
+    print(json.dumps(result, indent=2))
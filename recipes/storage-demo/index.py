@@ -6,8 +6,20 @@ Demonstrates KV, D1, and R2 storage operations
 
 import era_storage
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# orjson serializes and parses several times faster than the json module; use it when the sandbox has it
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
 def demo_kv():
     """Demonstrate KV storage operations"""
     print("📦 KV Storage Demo")
@@ -20,17 +32,16 @@ def demo_kv():
         "preferences": {"theme": "dark", "notifications": True}
     }
 
-    era_storage.kv.set("demo", "user:alice", json.dumps(user_data))
+    era_storage.kv.set("demo", "user:alice", _dumps(user_data))
     print("✅ Stored user data")
 
     # Retrieve user data
     retrieved = era_storage.kv.get("demo", "user:alice")
-    user = json.loads(retrieved)
+    user = _loads(retrieved)
     print(f"👤 Retrieved user: {user['name']} ({user['email']})")
 
-    # Store multiple keys
-    for i in range(3):
-        era_storage.kv.set("demo", f"item:{i}", f"Item {i}")
+    # Store multiple keys in one request
+    era_storage.kv.multi_set("demo", {f"item:{i}": f"Item {i}" for i in range(3)})
 
     # List keys
     keys = era_storage.kv.list("demo", prefix="item:")
@@ -54,13 +65,11 @@ def demo_d1():
     """)
     print("✅ Created todos table")
 
-    # Insert tasks
+    # Insert tasks (one request and transaction for all of them)
     tasks = ["Learn ERA Storage", "Build something cool", "Deploy to production"]
-    for task in tasks:
-        era_storage.d1.exec("demo",
-            "INSERT INTO todos (title) VALUES (?)",
-            [task]
-        )
+    era_storage.d1.batch("demo", [
+        ("INSERT INTO todos (title) VALUES (?)", [task]) for task in tasks
+    ])
     print(f"➕ Added {len(tasks)} tasks")
 
     # Query tasks
@@ -91,11 +100,12 @@ def demo_r2():
     )
     print("✅ Stored hello.txt")
 
-    # Store multiple files
-    for i in range(3):
-        era_storage.r2.put("demo", f"logs/log-{i}.txt",
-            f"Log entry {i}\n".encode()
-        )
+    # Store multiple files concurrently (each upload is its own request)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(
+            lambda i: era_storage.r2.put("demo", f"logs/log-{i}.txt", f"Log entry {i}\n".encode()),
+            range(3)
+        ))
 
     # List objects
     objects = era_storage.r2.list("demo", prefix="logs/")
@@ -1,58 +1,125 @@
 #!/usr/bin/env python3
 """
 Web Scraper Recipe
-Fetches and parses web content using requests and BeautifulSoup
+Fetches and parses web content using requests and lxml
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree
 import json
 import os
 
-def scrape_url(url):
-    """Scrape content from a URL"""
-    print(f"🌐 Fetching: {url}")
+# orjson serializes several times faster than the json module; use it when it's installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (compatible; ERA-Agent-Scraper/1.0)'
-    }
+# Shared session: repeated scrapes reuse pooled keep-alive connections instead of a new TCP+TLS handshake per URL
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (compatible; ERA-Agent-Scraper/1.0)'
+})
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3))
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+# How many headings and links the result keeps
+MAX_HEADINGS = 10
+MAX_LINKS = 20
 
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
+# Bytes read from the response per parser feed
+_CHUNK_SIZE = 65536
 
-    soup = BeautifulSoup(response.content, 'html.parser')
+# Elements whose text is not visible page content
+_SKIP_TEXT = {'script', 'style', 'template'}
 
-    # Extract title
-    title = soup.title.string if soup.title else "No title"
+def _text(el):
+    """Visible text of an element, each fragment stripped and joined"""
+    return ''.join(t.strip() for t in el.itertext())
+
+def scrape_url(url):
+    """Scrape content from a URL"""
+    print(f"🌐 Fetching: {url}")
 
-    # Extract all links
+    # Feed the body to the parser as it arrives instead of buffering all of it first
+    with _SESSION.get(url, timeout=10, stream=True) as response:
+        response.raise_for_status()
+
+        parser = etree.HTMLParser()
+        for chunk in response.iter_content(_CHUNK_SIZE):
+            parser.feed(chunk)
+        try:
+            tree = parser.close()
+        except etree.XMLSyntaxError:
+            # Empty or non-HTML body: there is nothing to extract
+            tree = None
+
+    title = None
+    found_title = False
+    description = None
+    found_description = False
     links = []
-    for a in soup.find_all('a', href=True):
-        href = a['href']
-        text = a.get_text(strip=True)
-        if href.startswith('http') and text:
-            links.append({'text': text, 'url': href})
-
-    # Extract all headings
-    headings = []
-    for tag in ['h1', 'h2', 'h3']:
-        for heading in soup.find_all(tag):
-            headings.append({
-                'level': tag,
-                'text': heading.get_text(strip=True)
-            })
-
-    # Extract meta description
-    meta_desc = soup.find('meta', attrs={'name': 'description'})
-    description = meta_desc['content'] if meta_desc else None
+    headings = {'h1': [], 'h2': [], 'h3': []}
+    word_count = 0
+    in_word = False
+    skip_depth = 0
+
+    def count_words(text):
+        # Adjacent text fragments join without a separator, so a word may span two fragments
+        nonlocal word_count, in_word
+        if not text:
+            return
+        words = len(text.split())
+        if words and in_word and not text[0].isspace():
+            words -= 1
+        word_count += words
+        in_word = not text[-1].isspace()
+
+    # One pass over the tree collects everything; tails are emitted at 'end' so text stays in document order.
+    # Links and headings stop at their caps, but the word count needs the whole document so the walk runs to the end.
+    walk = etree.iterwalk(tree, events=('start', 'end', 'comment')) if tree is not None else ()
+    for event, el in walk:
+        tag = el.tag
+        if event == 'comment':
+            count_words(el.tail)
+            continue
+
+        if event == 'end':
+            if tag in _SKIP_TEXT:
+                skip_depth -= 1
+            count_words(el.tail)
+            continue
+
+        if tag in _SKIP_TEXT:
+            skip_depth += 1
+        elif not skip_depth:
+            count_words(el.text)
+
+        if tag == 'a' and len(links) < MAX_LINKS:
+            href = el.get('href')
+            if href is not None and href.startswith('http'):
+                text = _text(el)
+                if text:
+                    links.append({'text': text, 'url': href})
+        elif tag in headings and len(headings[tag]) < MAX_HEADINGS:
+            headings[tag].append({'level': tag, 'text': _text(el)})
+        elif tag == 'title' and not found_title:
+            found_title = True
+            title = el.text
+        elif tag == 'meta' and not found_description and el.get('name') == 'description':
+            found_description = True
+            description = el.attrib['content']
 
     return {
         'url': url,
-        'title': title,
+        'title': title if found_title else "No title",
         'description': description,
-        'headings': headings[:10],  # First 10 headings
-        'links': links[:20],  # First 20 links
-        'word_count': len(soup.get_text().split())
+        'headings': (headings['h1'] + headings['h2'] + headings['h3'])[:MAX_HEADINGS],
+        'links': links,
+        'word_count': word_count
     }
 
 def main():
@@ -88,7 +155,10 @@ def main():
 
         # Output JSON for programmatic use
         print(f"\n📦 Full data (JSON):")
-        print(json.dumps(data, indent=2))
+        if orjson is not None:
+            print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+        else:
+            print(json.dumps(data, indent=2))
 
     except requests.RequestException as e:
         print(f"❌ Error fetching URL: {e}")
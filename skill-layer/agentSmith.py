@@ -4,18 +4,296 @@ Simple LangChain Agent for discovering and executing skills.
 Skills are expected to follow the Claude Skills format with SKILL.md files.
 """
 
+import io
 import os
 import sys
 import re
+import json
+import hashlib
+import signal
 import subprocess
+import threading
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from importlib.metadata import distribution, PackageNotFoundError
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Iterator, Literal, Optional, Set, TextIO, Tuple
 import yaml
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 from dotenv import load_dotenv
 
-from langchain_anthropic import ChatAnthropic
-from langchain_openai import ChatOpenAI
+# LangChain provider packages (and pydantic) are imported in SkillAgent.__init__ once the
+# provider is known; discovery and listing don't need them
+
+# Prefer libyaml's C loader; fall back to the pure-Python one when PyYAML was built without it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Top-level module of an import statement; [ \t] keeps matches within a single line
+_IMPORT_RE = re.compile(r'^[ \t]*(?:from|import)[ \t]+([A-Za-z_][A-Za-z0-9_]*)', re.MULTILINE)
+# The same, matched against one line at a time
+_IMPORT_LINE_RE = re.compile(r'[ \t]*(?:from|import)[ \t]+([A-Za-z_][A-Za-z0-9_]*)')
+# ```python ... ``` code blocks in markdown
+_PY_CODE_RE = re.compile(r'```python\n(.*?)```', re.DOTALL)
+_DIGIT_RE = re.compile(r'\d+')
+# A "key: value" frontmatter line whose value YAML would read as a plain string: no quoting,
+# flow/block syntax, anchors, tags, comments or nested mappings, and not a bool, null or number
+_FRONTMATTER_LINE_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_-]*): +([^\s\[\]{}|>&*!%@`\'"#,?:<=0-9+.~-][^\t]*?) *')
+_YAML_KEYWORD_RE = re.compile(r'(?:y|Y|yes|Yes|YES|n|N|no|No|NO|true|True|TRUE|false|False|FALSE'
+                              r'|on|On|ON|off|Off|OFF|null|Null|NULL)')
+# Common import to package name mappings (read-only)
+_IMPORT_TO_PACKAGE = MappingProxyType({
+    'pypdf': 'pypdf',
+    'pdfplumber': 'pdfplumber',
+    'pandas': 'pandas',
+    'reportlab': 'reportlab',
+    'pytesseract': 'pytesseract',
+    'pdf2image': 'pdf2image',
+    'PIL': 'Pillow',
+    'cv2': 'opencv-python',
+    'numpy': 'numpy',
+    'requests': 'requests',
+    'bs4': 'beautifulsoup4',
+    'sklearn': 'scikit-learn',
+    'torch': 'torch',
+    'tensorflow': 'tensorflow',
+})
+# End of the package name in a requirements.txt line: a version specifier, marker or whitespace
+_SPEC_RE = re.compile(r'[<>=!~;\s]')
+
+# Documentation files loaded alongside SKILL.md
+_SKILL_DOC_FILES = ('reference.md', 'forms.md', 'README.md', 'LICENSE.txt')
+
+# Discovery reads SKILL.md in chunks of this many characters until the frontmatter ends
+_FRONTMATTER_READ_SIZE = 4096
+
+# Parsed skills are cached as JSON under the storage path, keyed by SKILL.md path, mtime and size;
+# full skills also record the stats of the resource files they were built from
+SKILL_CACHE_DIR = '.skill_cache'
+
+# Opt-in (ERA_SKILL_RESPONSE_CACHE=1): LLM responses are cached by (provider, model, system prompt, request)
+# so repeated requests skip the API call. Only responses whose code ran successfully are kept.
+RESPONSE_CACHE_DIR = Path(os.getenv('ERA_SKILL_RESPONSE_CACHE_DIR', Path.home() / '.cache' / 'era_skill' / 'responses'))
+RESPONSE_CACHE_ENABLED = os.getenv('ERA_SKILL_RESPONSE_CACHE', '0') == '1'
+RESPONSE_CACHE_MAX_ENTRIES = 200
+
+# Shared pool so a skill's documentation and script reads overlap instead of running one by one
+_READ_POOL = ThreadPoolExecutor(max_workers=8)
+
+
+def _iter_files(root: Path) -> Iterator[os.DirEntry]:
+    """Recursively yield directory entries for all files under root, using os.scandir's cached file types"""
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_files(Path(entry.path))
+                elif entry.is_file():
+                    yield entry
+    except PermissionError:
+        pass
+
+
+def _read_text(path: Path) -> str:
+    """Read a UTF-8 text file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _scan_imports(path: Path) -> Set[str]:
+    """Top-level modules imported anywhere in a Python file, read line by line"""
+    modules = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            m = _IMPORT_LINE_RE.match(line)
+            if m:
+                modules.add(m.group(1))
+    return modules
+
+
+# Runs inside the persistent worker: reads one JSON request per line, forks a child that executes
+# the code, and replies with one JSON line. The fork keeps the warm interpreter while giving each
+# block the isolation of a fresh process (modules, environment, cwd and threads don't carry over).
+_WORKER_SRC = r'''
+import atexit, importlib, io, json, os, sys, tempfile, threading, traceback, types
+
+# Keep private handles on the request/reply pipes; user code gets /dev/null as stdin
+# and stray fd-level writes to stdout land on stderr instead of corrupting replies
+requests = os.fdopen(os.dup(0), 'r', encoding='utf-8')
+replies = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+os.dup2(2, 1)
+
+
+def run_block(code):
+    """Runs in the forked child; never returns"""
+    requests.close()
+    replies.close()
+
+    # Run as a real __main__ module, as `python -` would, so functions defined in the
+    # block can be pickled (multiprocessing, concurrent.futures) by reference
+    main = types.ModuleType('__main__')
+    main.__file__ = '<stdin>'
+    sys.modules['__main__'] = main
+    sys.argv = ['-']
+
+    returncode = 0
+    try:
+        exec(compile(code, '<stdin>', 'exec'), main.__dict__)
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            returncode = e.code
+        elif e.code is not None:
+            print(e.code, file=sys.stderr)
+            returncode = 1
+    except BaseException as e:
+        # Leave this function's frame out of the traceback
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        returncode = 1
+    try:
+        # Like interpreter shutdown: wait for non-daemon threads, run atexit handlers, then flush
+        for thread in threading.enumerate():
+            if thread is not threading.main_thread() and not thread.daemon:
+                thread.join()
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.__stdout__.flush()
+    finally:
+        os._exit(returncode & 0xff)
+
+
+def read_capture(f):
+    f.seek(0)
+    return f.read().decode('utf-8', errors='replace')
+
+
+for line in requests:
+    request = json.loads(line)
+
+    # Pick up packages installed since the worker started
+    importlib.invalidate_caches()
+
+    # Capture at the file-descriptor level so output from subprocesses and C extensions is kept too
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        pid = os.fork()
+        if pid == 0:
+            os.dup2(stdout.fileno(), 1)
+            os.dup2(stderr.fileno(), 2)
+            sys.stdout = io.TextIOWrapper(open(1, 'wb', buffering=0, closefd=False),
+                                          encoding='utf-8', write_through=True)
+            sys.stderr = io.TextIOWrapper(open(2, 'wb', buffering=0, closefd=False),
+                                          encoding='utf-8', errors='backslashreplace', write_through=True)
+            run_block(request['code'])
+
+        _, status = os.waitpid(pid, 0)
+        replies.write(json.dumps({
+            'returncode': os.waitstatus_to_exitcode(status),
+            'stdout': read_capture(stdout),
+            'stderr': read_capture(stderr),
+        }) + '\n')
+        replies.flush()
+'''
+
+
+class PythonWorker:
+    """
+    Long-lived Python subprocess that executes code blocks, so interpreter startup is paid once per session.
+    Where os.fork is unavailable each block runs in a fresh interpreter instead.
+    """
+
+    def __init__(self, timeout: int = 30):
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+
+    def _send(self, request: Dict) -> subprocess.Popen:
+        """Send a request, starting (or restarting) the worker if it isn't running"""
+        line = json.dumps(request) + '\n'
+        for attempt in range(2):
+            if self._proc is None or self._proc.poll() is not None:
+                # Own session, so a timeout can kill the block and anything it spawned
+                self._proc = subprocess.Popen(
+                    [sys.executable, "-u", "-c", _WORKER_SRC],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    text=True,
+                    encoding='utf-8',
+                    start_new_session=True
+                )
+            try:
+                self._proc.stdin.write(line)
+                self._proc.stdin.flush()
+                return self._proc
+            except BrokenPipeError:
+                # The worker exited between requests
+                self._proc = None
+                if attempt:
+                    raise
+
+    def run(self, code: str) -> Tuple[int, str, str]:
+        """Execute code and return (returncode, stdout, stderr); raises subprocess.TimeoutExpired if it hangs"""
+        if not hasattr(os, 'fork'):
+            result = subprocess.run(
+                [sys.executable, "-"],
+                input=code,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout
+            )
+            return result.returncode, result.stdout, result.stderr
+
+        proc = self._send({'code': code})
+
+        # Kill the worker's process group if the block doesn't finish in time; the next run starts a fresh one
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        watchdog = threading.Timer(self.timeout, kill)
+        watchdog.start()
+        try:
+            line = proc.stdout.readline()
+        finally:
+            watchdog.cancel()
+
+        if not line:
+            # The worker died (watchdog, crash)
+            proc.wait()
+            self._proc = None
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(proc.args, self.timeout)
+            return proc.returncode, "", ""
+
+        reply = json.loads(line)
+        return reply['returncode'], reply['stdout'], reply['stderr']
+
+
+def _scan_frontmatter(text: str) -> Optional[Dict[str, str]]:
+    """
+    Parse frontmatter made only of simple "key: value" lines without a YAML parser.
+    Returns None if any line needs real YAML handling.
+    """
+    metadata = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        m = _FRONTMATTER_LINE_RE.fullmatch(line)
+        if not m:
+            return None
+        key, value = m.groups()
+        if (': ' in value or ' #' in value or value.endswith(':')
+                or _YAML_KEYWORD_RE.fullmatch(key) or _YAML_KEYWORD_RE.fullmatch(value)):
+            return None
+        metadata[key] = value
+    return metadata
 
 
 @dataclass
@@ -28,6 +306,7 @@ class Skill:
     additional_files: Dict[str, str]  # filename -> content mapping
     scripts_available: List[str]  # list of available script paths
     dependencies: List[str] = None  # Python packages required
+    _full_context: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.dependencies is None:
@@ -37,27 +316,52 @@ class Skill:
         return f"{self.name}: {self.description}"
 
     def get_full_context(self) -> str:
-        """Get complete skill context including all resources"""
-        context = [f"# Skill: {self.name}\n"]
-        context.append(f"## Description\n{self.description}\n")
-        context.append(f"## Skill Base Path\n{self.path}\n")
-        context.append(f"## Main Instructions\n{self.instructions}\n")
+        """Get complete skill context including all resources (built once, skills don't change after loading)"""
+        if self._full_context is not None:
+            return self._full_context
+
+        # Sections are separated by a blank line; each write starts with the separating newline
+        context = io.StringIO()
+        context.write(f"# Skill: {self.name}\n")
+        context.write(f"\n## Description\n{self.description}\n")
+        context.write(f"\n## Skill Base Path\n{self.path}\n")
+        context.write(f"\n## Main Instructions\n{self.instructions}\n")
         
         # Add additional documentation files
         if self.additional_files:
-            context.append("\n## Additional Documentation Files\n")
+            context.write("\n\n## Additional Documentation Files\n")
             for filename, content in self.additional_files.items():
-                context.append(f"\n### File: {filename}\n")
-                context.append(f"```markdown\n{content}\n```\n")
+                context.write(f"\n\n### File: {filename}\n")
+                context.write(f"\n```markdown\n{content}\n```\n")
         
         # Add available scripts
         if self.scripts_available:
-            context.append("\n## Available Scripts\n")
-            context.append("The following scripts are available in the skill's scripts/ directory:\n")
+            context.write("\n\n## Available Scripts\n")
+            context.write("\nThe following scripts are available in the skill's scripts/ directory:\n")
             for script in self.scripts_available:
-                context.append(f"- {script}\n")
+                context.write(f"\n- {script}\n")
         
-        return "\n".join(context)
+        self._full_context = context.getvalue()
+        return self._full_context
+
+
+@dataclass
+class SkillMetadata:
+    """Catalog entry for a skill: just its frontmatter, enough to list and select it"""
+    name: str
+    description: str
+    path: Path
+    loader: Callable[[], Optional[Skill]] = field(repr=False, compare=False)
+    _skill: Optional[Skill] = field(default=None, init=False, repr=False, compare=False)
+
+    def __str__(self):
+        return f"{self.name}: {self.description}"
+
+    def load_body(self) -> Optional[Skill]:
+        """Load the full skill (instructions, documentation, scripts, dependencies) on first use"""
+        if self._skill is None:
+            self._skill = self.loader()
+        return self._skill
 
 
 class SkillDiscovery:
@@ -65,10 +369,17 @@ class SkillDiscovery:
 
     def __init__(self, storage_path: str):
         self.storage_path = Path(storage_path)
-        self.skills: List[Skill] = []
-
-    def find_skills(self) -> List[Skill]:
-        """Find all SKILL.md files in the storage path"""
+        self.cache_dir = self.storage_path / SKILL_CACHE_DIR
+        self.skills: List[SkillMetadata] = []
+        # SKILL.md -> (cache file, entry) from earlier scans, reused while the file is unchanged
+        self._known: Dict[Path, Tuple[Path, SkillMetadata]] = {}
+        # SKILL.md -> resource fingerprint of the skill body last returned by load_skill
+        self._loaded_resources: Dict[Path, str] = {}
+        # Set when a scan writes a new cache entry, which may have replaced an older one
+        self._cache_written = False
+
+    def find_skills(self) -> List[SkillMetadata]:
+        """Find all SKILL.md files in the storage path and read their frontmatter"""
         self.skills = []
 
         if not self.storage_path.exists():
@@ -77,8 +388,12 @@ class SkillDiscovery:
 
         print(f"\n🔍 Searching for SKILL.md files in: {self.storage_path}")
 
-        # Find all SKILL.md files
-        skill_files_found = list(self.storage_path.rglob("SKILL.md"))
+        # Find all SKILL.md files, skipping hidden directories such as .git and the skill cache
+        skill_files_found = []
+        for root, dirs, files in os.walk(self.storage_path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            if "SKILL.md" in files:
+                skill_files_found.append(Path(root, "SKILL.md"))
 
         if not skill_files_found:
             print(f"⚠️  No SKILL.md files found in {self.storage_path}")
@@ -86,157 +401,295 @@ class SkillDiscovery:
 
         print(f"📄 Found {len(skill_files_found)} SKILL.md file(s)")
 
-        for skill_file in skill_files_found:
-            print(f"\n  → Parsing: {skill_file.relative_to(self.storage_path)}")
-            try:
-                skill = self._parse_skill(skill_file)
+        # Parse skills in parallel; each worker buffers its own log so output stays grouped per skill
+        with ThreadPoolExecutor(max_workers=min(32, len(skill_files_found))) as pool:
+            for skill, log in pool.map(self._load_metadata, skill_files_found):
+                sys.stdout.write(log)
                 if skill:
                     self.skills.append(skill)
-                    print(f"    ✓ Successfully loaded skill: {skill.name}")
-                    print(f"      Description: {skill.description[:80]}...")
-            except Exception as e:
-                print(f"    ✗ Error parsing {skill_file}: {e}")
+
+        if self._cache_written:
+            self._prune_cache(skill_files_found)
 
         return self.skills
 
-    def _extract_dependencies(self, skill_dir: Path, instructions: str, additional_files: Dict[str, str]) -> List[str]:
+    def _load_metadata(self, skill_file: Path) -> Tuple[Optional[SkillMetadata], str]:
+        """Read a skill's catalog entry from the cache or its frontmatter; returns it and its progress log"""
+        out = io.StringIO()
+        print(f"\n  → Parsing: {skill_file.relative_to(self.storage_path)}", file=out)
+        skill = None
+        try:
+            cache_file = self._cache_file(skill_file)
+            known = self._known.get(skill_file)
+            if known and known[0] == cache_file:
+                # Rescan within this process: unchanged since the last find_skills, only a stat was needed
+                skill = known[1]
+                # A loaded body is only kept while its resource files are unchanged too
+                if (skill._skill is not None
+                        and self._loaded_resources.get(skill_file) != self._resource_fingerprint(skill.path)):
+                    skill._skill = None
+                print(f"    ✓ Unchanged skill: {skill.name}", file=out)
+                return skill, out.getvalue()
+
+            metadata = self._read_cache(cache_file)
+            if metadata:
+                print(f"    ⚡ Loaded from cache", file=out)
+            else:
+                parsed = self._parse_frontmatter(skill_file, out, with_instructions=False)
+                if parsed:
+                    metadata = {'name': parsed[0]['name'], 'description': parsed[0]['description']}
+                    self._write_cache(cache_file, metadata, out)
+            if metadata:
+                skill = SkillMetadata(
+                    name=metadata['name'],
+                    description=metadata['description'],
+                    path=skill_file.parent,
+                    loader=partial(self.load_skill, skill_file)
+                )
+                self._known[skill_file] = (cache_file, skill)
+                print(f"    ✓ Successfully loaded skill: {skill.name}", file=out)
+                print(f"      Description: {skill.description[:80]}...", file=out)
+        except Exception as e:
+            print(f"    ✗ Error parsing {skill_file}: {e}", file=out)
+        return skill, out.getvalue()
+
+    def load_skill(self, skill_file: Path) -> Optional[Skill]:
+        """Load a full skill from the cache, or parse SKILL.md and scan its resources"""
+        cache_file = self._cache_file(skill_file)
+        cached = self._read_cache(cache_file)
+        resources = self._resource_fingerprint(skill_file.parent)
+        self._loaded_resources[skill_file] = resources
+        if cached and 'skill' in cached and cached.get('resources') == resources:
+            data = cached['skill']
+            data['path'] = Path(data['path'])
+            return Skill(**data)
+
+        # Collect the scan log and write it once
+        out = io.StringIO()
+        print(f"\n📂 Loading skill resources: {skill_file.relative_to(self.storage_path)}", file=out)
+        skill = self._parse_skill(skill_file, out)
+        if skill:
+            data = asdict(skill)
+            data['path'] = str(skill.path)
+            del data['_full_context']
+            self._write_cache(cache_file, {'name': skill.name, 'description': skill.description,
+                                           'skill': data, 'resources': resources}, out)
+        sys.stdout.write(out.getvalue())
+        return skill
+
+    def _cache_file(self, skill_file: Path) -> Path:
+        """Cache file for a SKILL.md; editing or replacing SKILL.md changes the key"""
+        st = skill_file.stat()
+        key = hashlib.sha1(f"{skill_file}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _resource_fingerprint(self, skill_dir: Path) -> str:
+        """Digest of the path, mtime and size of every file a full parse reads besides SKILL.md"""
+        digest = hashlib.sha1()
+        for name in (*_SKILL_DOC_FILES, 'requirements.txt'):
+            try:
+                st = os.stat(skill_dir / name)
+            except OSError:
+                continue
+            digest.update(f"{name}|{st.st_mtime_ns}|{st.st_size}\n".encode())
+
+        scripts_dir = skill_dir / 'scripts'
+        if scripts_dir.is_dir():
+            for entry in sorted(_iter_files(scripts_dir), key=lambda entry: entry.path):
+                st = entry.stat()
+                digest.update(f"{entry.path}|{st.st_mtime_ns}|{st.st_size}\n".encode())
+        return digest.hexdigest()
+
+    def _read_cache(self, cache_file: Path) -> Optional[Dict]:
+        """Read a cache entry (name, description and, once loaded, the full skill), or None on a miss"""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def _write_cache(self, cache_file: Path, data: Dict, out: TextIO) -> None:
+        """Write a cache entry"""
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            self._cache_written = True
+        except OSError as e:
+            print(f"    ⚠️  Could not write skill cache: {e}", file=out)
+
+    def _prune_cache(self, skill_files: List[Path]) -> None:
+        """Delete cache entries that no discovered SKILL.md maps to (edited, moved or removed skills)"""
+        self._cache_written = False
+        live = {self._known[skill_file][0].name for skill_file in skill_files if skill_file in self._known}
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                stale = [entry.path for entry in entries if entry.name.endswith('.json') and entry.name not in live]
+        except OSError:
+            return
+        for path in stale:
+            try:
+                os.unlink(path)
+            except OSError:
+                # Already removed by another process sharing the storage path
+                pass
+
+    def _extract_dependencies(self, skill_dir: Path, instructions: str, additional_files: Dict[str, str],
+                              py_scripts: List[Path], out: TextIO) -> List[str]:
         """Extract Python dependencies from skill files"""
         dependencies = set()
 
-        # Common import to package name mappings
-        import_to_package = {
-            'pypdf': 'pypdf',
-            'pdfplumber': 'pdfplumber',
-            'pandas': 'pandas',
-            'reportlab': 'reportlab',
-            'pytesseract': 'pytesseract',
-            'pdf2image': 'pdf2image',
-            'PIL': 'Pillow',
-            'cv2': 'opencv-python',
-            'numpy': 'numpy',
-            'requests': 'requests',
-            'bs4': 'beautifulsoup4',
-            'sklearn': 'scikit-learn',
-            'torch': 'torch',
-            'tensorflow': 'tensorflow',
-        }
-
         # Check for requirements.txt in skill directory
         requirements_file = skill_dir / 'requirements.txt'
-        if requirements_file.exists():
-            try:
-                with open(requirements_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            # Extract package name (before any version specifiers)
-                            pkg = line.split('==')[0].split('>=')[0].split('<=')[0].split('>')[0].split('<')[0].strip()
+        try:
+            with open(requirements_file, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    # Skip blanks, comments and pip options (-r, -e, --index-url, ...)
+                    if line and not line.startswith(('#', '-')):
+                        # Extract package name (before any version specifiers or markers)
+                        pkg = _SPEC_RE.split(line, 1)[0]
+                        if pkg:
                             dependencies.add(pkg)
-                return list(dependencies)
-            except Exception as e:
-                print(f"       ⚠️  Error reading requirements.txt: {e}")
-
-        # Otherwise, extract from imports in instructions and additional files
-        all_content = instructions
-        for content in additional_files.values():
-            all_content += "\n" + content
-
-        # Find all import statements
-        import_pattern = r'^(?:from|import)\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        matches = re.findall(import_pattern, all_content, re.MULTILINE)
-
-        for module in matches:
-            # Map import to package name
-            if module in import_to_package:
-                dependencies.add(import_to_package[module])
-
-        # Also check scripts directory
-        scripts_dir = skill_dir / 'scripts'
-        if scripts_dir.exists() and scripts_dir.is_dir():
-            for script_file in scripts_dir.rglob('*.py'):
-                try:
-                    with open(script_file, 'r', encoding='utf-8') as f:
-                        script_content = f.read()
-                        matches = re.findall(import_pattern, script_content, re.MULTILINE)
-                        for module in matches:
-                            if module in import_to_package:
-                                dependencies.add(import_to_package[module])
-                except Exception:
-                    pass
+            return list(dependencies)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"       ⚠️  Error reading requirements.txt: {e}", file=out)
+
+        # Otherwise, extract from imports in instructions and additional files,
+        # scanning each text in place rather than concatenating them
+        for content in (instructions, *additional_files.values()):
+            for m in _IMPORT_RE.finditer(content):
+                pkg = _IMPORT_TO_PACKAGE.get(m.group(1))
+                if pkg:
+                    dependencies.add(pkg)
+
+        # Also check the Python files in the scripts directory
+        scans = [_READ_POOL.submit(_scan_imports, script_file) for script_file in py_scripts]
+        for scan in scans:
+            try:
+                modules = scan.result()
+            except Exception:
+                continue
+            for module in modules:
+                pkg = _IMPORT_TO_PACKAGE.get(module)
+                if pkg:
+                    dependencies.add(pkg)
 
         return list(dependencies)
 
-    def _parse_skill(self, skill_file: Path) -> Optional[Skill]:
-        """Parse a SKILL.md file with YAML frontmatter and discover all skill resources"""
+    def _parse_frontmatter(self, skill_file: Path, out: TextIO,
+                           with_instructions: bool = True) -> Optional[Tuple[Dict, Optional[str]]]:
+        """
+        Parse a SKILL.md file's YAML frontmatter; returns (metadata, instructions).
+        Without with_instructions only the head of the file up to the frontmatter's end is read.
+        """
         with open(skill_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+            content = f.read(_FRONTMATTER_READ_SIZE)
+
+            # Split frontmatter and instructions
+            if not content.startswith('---'):
+                print(f"    ⚠️  Warning: {skill_file} missing YAML frontmatter", file=out)
+                return None
+
+            # The frontmatter runs up to the next '---'; slice around it rather than splitting into a list
+            end = content.find('---', 3)
+            while end < 0:
+                chunk = f.read(_FRONTMATTER_READ_SIZE)
+                if not chunk:
+                    break
+                # Resume the search where a '---' could straddle the previous chunk
+                start = max(3, len(content) - 2)
+                content += chunk
+                end = content.find('---', start)
 
-        # Split frontmatter and instructions
-        if not content.startswith('---'):
-            print(f"    ⚠️  Warning: {skill_file} missing YAML frontmatter")
-            return None
+            if end >= 0 and with_instructions:
+                content += f.read()
 
-        parts = content.split('---', 2)
-        if len(parts) < 3:
-            print(f"    ⚠️  Warning: {skill_file} has malformed frontmatter")
+        if end < 0:
+            print(f"    ⚠️  Warning: {skill_file} has malformed frontmatter", file=out)
             return None
+        frontmatter = content[3:end]
 
-        # Parse YAML frontmatter
+        # Parse YAML frontmatter; plain "key: value" lines don't need the YAML parser
         try:
-            metadata = yaml.safe_load(parts[1])
+            metadata = _scan_frontmatter(frontmatter)
+            if metadata is None:
+                metadata = yaml.load(frontmatter, Loader=_YamlLoader)
         except yaml.YAMLError as e:
-            print(f"    ✗ Error parsing YAML in {skill_file}: {e}")
+            print(f"    ✗ Error parsing YAML in {skill_file}: {e}", file=out)
             return None
 
         if not metadata or 'name' not in metadata or 'description' not in metadata:
-            print(f"    ⚠️  Warning: {skill_file} missing required name or description")
+            print(f"    ⚠️  Warning: {skill_file} missing required name or description", file=out)
+            return None
+
+        return metadata, content[end + 3:].strip() if with_instructions else None
+
+    def _parse_skill(self, skill_file: Path, out: Optional[TextIO] = None) -> Optional[Skill]:
+        """Parse a SKILL.md file with YAML frontmatter and discover all skill resources"""
+        if out is None:
+            out = sys.stdout
+
+        parsed = self._parse_frontmatter(skill_file, out)
+        if not parsed:
             return None
 
-        instructions = parts[2].strip()
+        metadata, instructions = parsed
         skill_dir = skill_file.parent
 
         # Discover additional documentation files
         additional_files = {}
-        common_doc_files = ['reference.md', 'forms.md', 'README.md', 'LICENSE.txt']
-        print(f"    📚 Scanning for additional documentation files...")
-        for doc_file in common_doc_files:
-            doc_path = skill_dir / doc_file
-            if doc_path.exists() and doc_path.is_file():
-                try:
-                    with open(doc_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        additional_files[doc_file] = content
-                        size_kb = len(content) / 1024
-                        print(f"       • Found: {doc_file} ({size_kb:.1f} KB)")
-                except Exception as e:
-                    print(f"       ⚠️  Could not read {doc_path}: {e}")
+        print(f"    📚 Scanning for additional documentation files...", file=out)
+        # Open candidates directly; a missing file costs one failed open instead of two stats
+        reads = [
+            (doc_file, skill_dir / doc_file, _READ_POOL.submit(_read_text, skill_dir / doc_file))
+            for doc_file in _SKILL_DOC_FILES
+        ]
+
+        for doc_file, doc_path, read in reads:
+            try:
+                content = read.result()
+                additional_files[doc_file] = content
+                size_kb = len(content) / 1024
+                print(f"       • Found: {doc_file} ({size_kb:.1f} KB)", file=out)
+            except (FileNotFoundError, IsADirectoryError):
+                continue
+            except Exception as e:
+                print(f"       ⚠️  Could not read {doc_path}: {e}", file=out)
 
         if not additional_files:
-            print(f"       (No additional documentation files found)")
+            print(f"       (No additional documentation files found)", file=out)
 
-        # Discover available scripts
+        # Discover available scripts, collecting the Python ones for the dependency scan in the same walk
         scripts_available = []
+        py_scripts = []
         scripts_dir = skill_dir / 'scripts'
-        print(f"    🔧 Scanning for scripts in scripts/ directory...")
-        if scripts_dir.exists() and scripts_dir.is_dir():
-            for script_file in scripts_dir.rglob('*'):
-                if script_file.is_file() and not script_file.name.startswith('.'):
+        print(f"    🔧 Scanning for scripts in scripts/ directory...", file=out)
+        if scripts_dir.is_dir():
+            for entry in _iter_files(scripts_dir):
+                script_file = Path(entry.path)
+                if entry.name.endswith('.py'):
+                    py_scripts.append(script_file)
+                if not entry.name.startswith('.'):
                     relative_path = script_file.relative_to(skill_dir)
                     scripts_available.append(str(relative_path))
-                    print(f"       • Found: {relative_path}")
+                    print(f"       • Found: {relative_path}", file=out)
         else:
-            print(f"       (No scripts directory found)")
+            print(f"       (No scripts directory found)", file=out)
 
         # Sort scripts for consistent ordering
         scripts_available.sort()
 
         # Extract dependencies
-        print(f"    📦 Scanning for Python dependencies...")
-        dependencies = self._extract_dependencies(skill_dir, instructions, additional_files)
+        print(f"    📦 Scanning for Python dependencies...", file=out)
+        dependencies = self._extract_dependencies(skill_dir, instructions, additional_files, py_scripts, out)
         if dependencies:
-            print(f"       • Found: {', '.join(dependencies)}")
+            print(f"       • Found: {', '.join(dependencies)}", file=out)
         else:
-            print(f"       (No dependencies detected)")
+            print(f"       (No dependencies detected)", file=out)
 
         return Skill(
             name=metadata['name'],
@@ -254,46 +707,35 @@ class SkillDiscovery:
             print("\n❌ No skills found.")
             return
 
-        print(f"\n{'='*70}")
-        print(f"📋 SKILL DISCOVERY SUMMARY")
-        print(f"{'='*70}")
-        print(f"\n✅ Successfully loaded {len(self.skills)} skill(s):\n")
+        # Build the summary in memory and write it once rather than printing line by line
+        out = io.StringIO()
+        print(f"\n{'='*70}", file=out)
+        print(f"📋 SKILL DISCOVERY SUMMARY", file=out)
+        print(f"{'='*70}", file=out)
+        print(f"\n✅ Successfully loaded {len(self.skills)} skill(s):\n", file=out)
 
+        # Resources (documentation, scripts, dependencies) are loaded when a skill is first used
         for i, skill in enumerate(self.skills, 1):
-            print(f"{i}. 🎯 {skill.name}")
-            print(f"   📝 Description: {skill.description}")
-            print(f"   📂 Path: {skill.path}")
-            print(f"   📄 Instructions: {len(skill.instructions)} characters")
-
-            # Show additional resources found
-            if skill.additional_files:
-                print(f"   📚 Additional files: {', '.join(skill.additional_files.keys())}")
-            else:
-                print(f"   📚 Additional files: None")
+            print(f"{i}. 🎯 {skill.name}", file=out)
+            print(f"   📝 Description: {skill.description}", file=out)
+            print(f"   📂 Path: {skill.path}", file=out)
+            print(file=out)
 
-            if skill.scripts_available:
-                print(f"   🔧 Scripts available: {len(skill.scripts_available)}")
-                for script in skill.scripts_available:
-                    print(f"      • {script}")
-            else:
-                print(f"   🔧 Scripts available: None")
-
-            if skill.dependencies:
-                print(f"   📦 Dependencies: {', '.join(skill.dependencies)}")
-            else:
-                print(f"   📦 Dependencies: None")
-
-            print()
+        sys.stdout.write(out.getvalue())
 
 
 class SkillAgent:
     """LangChain agent that can execute skills"""
 
-    def __init__(self, model_provider: str = "anthropic", model_name: Optional[str] = None, skills: List[Skill] = None):
+    def __init__(self, model_provider: str = "anthropic", model_name: Optional[str] = None,
+                 skills: List[SkillMetadata] = None):
         self.model_provider = model_provider.lower()
         self.conversation_history = []  # Track conversation history
         self.skills = skills or []  # Available skills
+        self._skills_by_name = {skill.name: skill for skill in self.skills}
         self.installed_dependencies = set()  # Track which skill dependencies are installed
+        self.worker = PythonWorker(timeout=30)  # Executes generated code blocks
+        self._prepared_skills = {}  # skill name -> (skill, system message, response-cache key prefix)
 
         # Load environment variables from .env file if it exists
         load_dotenv()
@@ -305,6 +747,7 @@ class SkillAgent:
         # Configure LLM based on provider
         if self.model_provider == "anthropic":
             model_name = model_name or "claude-sonnet-4-5-20250929"
+            self.model_name = model_name
 
             # Check for API key
             api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -316,9 +759,11 @@ class SkillAgent:
                 sys.exit(1)
 
             print(f"✓ API Key found for Anthropic")
+            from langchain_anthropic import ChatAnthropic
             self.llm = ChatAnthropic(model=model_name, temperature=0, api_key=api_key)
         elif self.model_provider == "openai":
             model_name = model_name or "gpt-4"
+            self.model_name = model_name
 
             # Check for API key
             api_key = os.getenv("OPENAI_API_KEY")
@@ -330,47 +775,81 @@ class SkillAgent:
                 sys.exit(1)
 
             print(f"✓ API Key found for OpenAI")
+            from langchain_openai import ChatOpenAI
             self.llm = ChatOpenAI(model=model_name, temperature=0, api_key=api_key)
         else:
             raise ValueError(f"Unsupported model provider: {model_provider}")
 
+        # The selector returns a skill name constrained to the known skills; the catalog
+        # listed in its prompt is built once since only names and descriptions are needed
+        self.skill_selector = None
+        self._skill_catalog = "\n".join(
+            f"- {name}: {skill.description}" for name, skill in self._skills_by_name.items()
+        )
+        if len(self._skills_by_name) > 1:
+            from pydantic import BaseModel, Field
+
+            class SkillChoice(BaseModel):
+                """The skill best suited to the user's request"""
+                name: Literal[tuple(self._skills_by_name)] = Field(description="Name of the selected skill")
+
+            # Tool calling works on every chat model; langchain-openai's json_schema default
+            # is rejected by models without structured outputs, such as the default gpt-4
+            self.skill_selector = self.llm.with_structured_output(SkillChoice, method="function_calling")
+
         print(f"✓ Initialized agent with {self.model_provider} model: {model_name}")
         print(f"{'='*70}\n")
 
-    def select_skill(self, user_request: str) -> Optional[Skill]:
+    def select_skill(self, user_request: str) -> Optional[SkillMetadata]:
         """Use LLM to select the most appropriate skill for the user's request"""
         if not self.skills:
             print("❌ No skills available")
             return None
 
-        if len(self.skills) == 1:
+        if self.skill_selector is None:
             return self.skills[0]
 
         # Create a prompt for skill selection
-        skill_descriptions = []
-        for i, skill in enumerate(self.skills, 1):
-            skill_descriptions.append(f"{i}. {skill.name}: {skill.description}")
+        selection_prompt = f"""Given the following user request and available skills, select the MOST appropriate skill to use.
+
+User Request: {user_request}
+
+Available Skills:
+{self._skill_catalog}
+"""
+
+        try:
+            messages = [{"role": "user", "content": selection_prompt}]
+            choice = self.skill_selector.invoke(messages)
+            selected_skill = self._skills_by_name[choice.name]
+        except Exception as e:
+            print(f"\n⚠️  Structured skill selection failed ({e}); asking for the skill's number instead")
+            return self._select_skill_by_number(user_request)
+
+        print(f"\n🎯 Selected skill: {selected_skill.name}")
+        print(f"   Reason: {selected_skill.description[:100]}...")
+        return selected_skill
 
+    def _select_skill_by_number(self, user_request: str) -> SkillMetadata:
+        """Plain-prompt selection for models without tool calling: ask for a skill number and parse it"""
+        skill_descriptions = "\n".join(
+            f"{i}. {skill.name}: {skill.description}" for i, skill in enumerate(self.skills, 1)
+        )
         selection_prompt = f"""Given the following user request and available skills, select the MOST appropriate skill to use.
 
 User Request: {user_request}
 
 Available Skills:
-{chr(10).join(skill_descriptions)}
+{skill_descriptions}
 
 Respond with ONLY the number of the most appropriate skill (1-{len(self.skills)}). Do not include any other text or explanation.
 """
 
         try:
-            messages = [{"role": "user", "content": selection_prompt}]
-            response = self.llm.invoke(messages)
-
-            # Extract the skill number from response
-            content = response.content.strip()
+            response = self.llm.invoke([{"role": "user", "content": selection_prompt}])
 
             # Try to find a number in the response
-            import re
-            numbers = re.findall(r'\d+', content)
+            numbers = _DIGIT_RE.findall(response.text)
             if numbers:
                 skill_num = int(numbers[0])
                 if 1 <= skill_num <= len(self.skills):
@@ -379,14 +858,11 @@ Respond with ONLY the number of the most appropriate skill (1-{len(self.skills)}
                     print(f"   Reason: {selected_skill.description[:100]}...")
                     return selected_skill
 
-            # Fallback to first skill if parsing fails
             print(f"\n⚠️  Could not parse skill selection, using first skill: {self.skills[0].name}")
-            return self.skills[0]
-
         except Exception as e:
             print(f"\n⚠️  Error selecting skill: {e}")
             print(f"   Using first skill: {self.skills[0].name}")
-            return self.skills[0]
+        return self.skills[0]
 
     def install_dependencies(self, skill: Skill) -> bool:
         """Install Python dependencies for a skill"""
@@ -406,23 +882,15 @@ Respond with ONLY the number of the most appropriate skill (1-{len(self.skills)}
         print(f"Dependencies to install: {', '.join(skill.dependencies)}")
         print(f"\nThis will run: pip install {' '.join(skill.dependencies)}\n")
 
-        # Check which packages are already installed
+        # Check which packages are already installed (in-process, no pip subprocess per package)
         already_installed = []
         to_install = []
 
         for package in skill.dependencies:
             try:
-                result = subprocess.run(
-                    [sys.executable, "-m", "pip", "show", package],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    already_installed.append(package)
-                else:
-                    to_install.append(package)
-            except Exception:
+                distribution(package)
+                already_installed.append(package)
+            except PackageNotFoundError:
                 to_install.append(package)
 
         if already_installed:
@@ -467,10 +935,7 @@ Respond with ONLY the number of the most appropriate skill (1-{len(self.skills)}
 
     def extract_python_code(self, text: str) -> List[str]:
         """Extract Python code blocks from markdown-formatted text"""
-        # Pattern to match ```python ... ``` code blocks
-        pattern = r'```python\n(.*?)```'
-        matches = re.findall(pattern, text, re.DOTALL)
-        return matches
+        return _PY_CODE_RE.findall(text)
 
     def execute_python_code(self, code: str) -> tuple[bool, str]:
         """Execute Python code and return success status and output"""
@@ -479,39 +944,26 @@ Respond with ONLY the number of the most appropriate skill (1-{len(self.skills)}
             print(f"⚙️  EXECUTING PYTHON CODE")
             print(f"{'='*70}\n")
 
-            # Write code to a temporary file
-            temp_file = Path("temp_skill_code.py")
-            with open(temp_file, 'w') as f:
-                f.write(code)
-
-            # Execute the code
-            result = subprocess.run(
-                [sys.executable, str(temp_file)],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            # Clean up temp file
-            temp_file.unlink()
+            # Execute the code in the persistent worker
+            returncode, stdout, stderr = self.worker.run(code)
 
             # Display output
-            if result.stdout:
+            if stdout:
                 print("📤 Output:")
-                print(result.stdout)
+                print(stdout)
 
-            if result.stderr:
+            if stderr:
                 print("⚠️  Errors/Warnings:")
-                print(result.stderr)
+                print(stderr)
 
             print(f"\n{'='*70}")
-            if result.returncode == 0:
+            if returncode == 0:
                 print(f"✅ CODE EXECUTION COMPLETED SUCCESSFULLY")
             else:
-                print(f"❌ CODE EXECUTION FAILED (exit code: {result.returncode})")
+                print(f"❌ CODE EXECUTION FAILED (exit code: {returncode})")
             print(f"{'='*70}\n")
 
-            return result.returncode == 0, result.stdout + result.stderr
+            return returncode == 0, stdout + stderr
 
         except subprocess.TimeoutExpired:
             print(f"\n❌ Code execution timed out after 30 seconds")
@@ -525,11 +977,16 @@ Respond with ONLY the number of the most appropriate skill (1-{len(self.skills)}
     def handle_request(self, user_input: str) -> str:
         """Handle a user request by selecting the appropriate skill and executing it"""
         # Select the best skill for this request
-        selected_skill = self.select_skill(user_input)
+        selected = self.select_skill(user_input)
 
-        if not selected_skill:
+        if not selected:
             return "❌ No suitable skill found for your request"
 
+        # Load the skill's resources on first use
+        selected_skill = selected.load_body()
+        if not selected_skill:
+            return f"❌ Could not load skill: {selected.name}"
+
         # Install dependencies if needed
         if selected_skill.dependencies and selected_skill.name not in self.installed_dependencies:
             install_success = self.install_dependencies(selected_skill)
@@ -540,22 +997,14 @@ Respond with ONLY the number of the most appropriate skill (1-{len(self.skills)}
         # Execute the skill
         return self.execute_skill(selected_skill, user_input)
 
-    def execute_skill(self, skill: Skill, user_input: str) -> str:
-        """Execute a skill based on its instructions and all available resources"""
-        print(f"\n{'='*70}")
-        print(f"🚀 EXECUTING SKILL: {skill.name}")
-        print(f"{'='*70}")
-
-        # Show what resources are being loaded
-        print(f"\n📦 Loading skill resources...")
-        print(f"   ✓ Main instructions: {len(skill.instructions)} characters")
-        if skill.additional_files:
-            print(f"   ✓ Additional documentation: {len(skill.additional_files)} file(s)")
-            for filename in skill.additional_files.keys():
-                print(f"      • {filename}")
-        if skill.scripts_available:
-            print(f"   ✓ Available scripts: {len(skill.scripts_available)}")
-        print(f"   ✓ Skill base path: {skill.path}")
+    def _prepare_skill(self, skill: Skill) -> Tuple[Dict, "hashlib.blake2b"]:
+        """
+        Build a skill's system message and response-cache key prefix.
+        Both depend only on the skill, so they are built once and reused for every request.
+        """
+        prepared = self._prepared_skills.get(skill.name)
+        if prepared and prepared[0] is skill:
+            return prepared[1], prepared[2]
 
         # Create a comprehensive system prompt that includes ALL skill resources
         system_prompt = f"""
@@ -581,6 +1030,88 @@ Your task is to follow the skill instructions above to fulfill the user's reques
 - Execute the skill to the best of your ability and provide a clear, actionable result
 """
 
+        # The system prompt is identical for every request to a skill. Mark it cacheable so Anthropic
+        # serves it from the prompt cache; OpenAI caches long stable prefixes automatically
+        if self.model_provider == "anthropic":
+            system_content = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+        else:
+            system_content = system_prompt
+        system_message = {"role": "system", "content": system_content}
+
+        cache_key = hashlib.blake2b(digest_size=16)
+        for part in (self.model_provider, self.model_name, system_prompt):
+            cache_key.update(part.encode('utf-8'))
+            cache_key.update(b'\0')
+
+        self._prepared_skills[skill.name] = (skill, system_message, cache_key)
+        return system_message, cache_key
+
+    def _response_cache_file(self, cache_key: "hashlib.blake2b", user_input: str) -> Path:
+        """Cache file for the response to a request, given the skill's key prefix"""
+        key = cache_key.copy()
+        key.update(user_input.encode('utf-8'))
+        return RESPONSE_CACHE_DIR / f"{key.hexdigest()}.json"
+
+    def _read_cached_response(self, cache_file: Path) -> Optional[str]:
+        """Return a cached response, or None on a miss"""
+        if not RESPONSE_CACHE_ENABLED:
+            return None
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                response = json.load(f)['response']
+            # Mark as recently used for eviction
+            os.utime(cache_file)
+        except (OSError, ValueError, KeyError):
+            return None
+        return response
+
+    def _write_cached_response(self, cache_file: Path, response: str) -> None:
+        """Store a response for later identical requests, evicting the least recently used entries"""
+        if not RESPONSE_CACHE_ENABLED:
+            return
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump({'response': response}, f)
+
+            with os.scandir(cache_file.parent) as entries:
+                cached = [entry for entry in entries if entry.name.endswith('.json')]
+            if len(cached) > RESPONSE_CACHE_MAX_ENTRIES:
+                cached.sort(key=lambda entry: entry.stat().st_mtime_ns)
+                for entry in cached[:len(cached) - RESPONSE_CACHE_MAX_ENTRIES]:
+                    os.unlink(entry.path)
+        except FileNotFoundError:
+            # Another agent evicted the same entry first
+            pass
+        except OSError as e:
+            print(f"\n⚠️  Could not cache response: {e}")
+
+    def _discard_cached_response(self, cache_file: Path) -> None:
+        """Drop a cached response whose code failed, so a retry asks the model again"""
+        try:
+            cache_file.unlink()
+        except OSError:
+            pass
+
+    def execute_skill(self, skill: Skill, user_input: str) -> str:
+        """Execute a skill based on its instructions and all available resources"""
+        print(f"\n{'='*70}")
+        print(f"🚀 EXECUTING SKILL: {skill.name}")
+        print(f"{'='*70}")
+
+        # Show what resources are being loaded
+        print(f"\n📦 Loading skill resources...")
+        print(f"   ✓ Main instructions: {len(skill.instructions)} characters")
+        if skill.additional_files:
+            print(f"   ✓ Additional documentation: {len(skill.additional_files)} file(s)")
+            for filename in skill.additional_files.keys():
+                print(f"      • {filename}")
+        if skill.scripts_available:
+            print(f"   ✓ Available scripts: {len(skill.scripts_available)}")
+        print(f"   ✓ Skill base path: {skill.path}")
+
+        system_message, cache_key = self._prepare_skill(skill)
+
         print(f"\n💭 User request: {user_input}")
         print(f"\n{'='*70}")
         print(f"🤖 Agent response:")
@@ -589,20 +1120,31 @@ Your task is to follow the skill instructions above to fulfill the user's reques
         try:
             # For simple direct LLM execution without tools, just use the LLM directly
             messages = [
-                {"role": "system", "content": system_prompt},
+                system_message,
                 {"role": "user", "content": user_input}
             ]
 
-            # Use streaming to show progress
-            result_parts = []
-            for chunk in self.llm.stream(messages):
-                if hasattr(chunk, 'content') and chunk.content:
-                    print(chunk.content, end='', flush=True)
-                    result_parts.append(chunk.content)
+            # Reuse the response to an identical earlier request, if any
+            cache_file = self._response_cache_file(cache_key, user_input)
+            result = self._read_cached_response(cache_file)
+            cached = result is not None
+            if cached:
+                print(f"⚡ Cached response\n")
+                print(result, end='', flush=True)
+            else:
+                # Use streaming to show progress
+                # chunk.text flattens content-block lists (which Anthropic may stream) into plain text
+                result_parts = []
+                for chunk in self.llm.stream(messages):
+                    text = chunk.text
+                    if text:
+                        print(text, end='', flush=True)
+                        result_parts.append(text)
 
-            result = "".join(result_parts) if result_parts else "No response generated"
+                result = "".join(result_parts) if result_parts else "No response generated"
 
             # Extract and execute any Python code in the response
+            all_succeeded = True
             code_blocks = self.extract_python_code(result)
             if code_blocks:
                 print(f"\n\n📝 Found {len(code_blocks)} Python code block(s) in response")
@@ -624,8 +1166,15 @@ Your task is to follow the skill instructions above to fulfill the user's reques
                             "content": f"Code executed successfully. Output:\n{output}"
                         })
                     else:
+                        all_succeeded = False
                         print(f"\n⚠️  Code execution failed. You can try to fix the code or ask for help.")
 
+            # Only keep responses that worked; a retry after a failure should get a fresh completion
+            if cached and not all_succeeded:
+                self._discard_cached_response(cache_file)
+            elif not cached and result_parts and all_succeeded:
+                self._write_cached_response(cache_file, result)
+
             print(f"\n{'='*70}")
             print(f"✅ SKILL EXECUTION COMPLETED")
             print(f"{'='*70}\n")
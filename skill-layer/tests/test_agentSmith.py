@@ -0,0 +1,117 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import agentSmith  # noqa: E402
+
+
+@pytest.fixture
+def worker():
+    return agentSmith.PythonWorker(timeout=30)
+
+
+def test_worker_pickles_functions_defined_in_a_block(worker):
+    returncode, stdout, stderr = worker.run(
+        "import pickle\n"
+        "def sq(x):\n"
+        "    return x * x\n"
+        "print(pickle.loads(pickle.dumps(sq))(3))\n"
+    )
+    assert (returncode, stdout, stderr) == (0, "9\n", "")
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs the forking worker")
+def test_worker_runs_process_pools_over_block_functions(worker):
+    returncode, stdout, stderr = worker.run(
+        "from concurrent.futures import ProcessPoolExecutor\n"
+        "def sq(x):\n"
+        "    return x * x\n"
+        "if __name__ == '__main__':\n"
+        "    with ProcessPoolExecutor(2) as pool:\n"
+        "        print(list(pool.map(sq, range(4))))\n"
+    )
+    assert (returncode, stdout) == (0, "[0, 1, 4, 9]\n"), stderr
+
+
+def test_worker_matches_a_fresh_interpreter(worker):
+    returncode, stdout, _ = worker.run(
+        "import atexit, sys\n"
+        "atexit.register(print, 'bye')\n"
+        "print(__file__, sys.argv)\n"
+    )
+    assert (returncode, stdout) == (0, "<stdin> ['-']\nbye\n")
+
+
+class _Reply:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FailingSelector:
+    def invoke(self, messages):
+        raise ValueError("json_schema is not supported by this model")
+
+
+class _NumberingLLM:
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[-1]["content"])
+        return _Reply(self.reply)
+
+
+def _agent_with(skills, llm, selector):
+    # Skip __init__: it needs an API key and a provider package
+    agent = object.__new__(agentSmith.SkillAgent)
+    agent.skills = skills
+    agent._skills_by_name = {skill.name: skill for skill in skills}
+    agent._skill_catalog = "\n".join(f"- {skill.name}: {skill.description}" for skill in skills)
+    agent.llm = llm
+    agent.skill_selector = selector
+    return agent
+
+
+def _skills(*names):
+    return [
+        agentSmith.SkillMetadata(name=name, description=f"{name} things", path=Path(name), loader=lambda: None)
+        for name in names
+    ]
+
+
+def test_select_skill_falls_back_to_numbered_prompt_when_structured_output_fails():
+    skills = _skills("pdf", "slack-gif-creator", "xlsx")
+    llm = _NumberingLLM("Skill 3")
+    agent = _agent_with(skills, llm, _FailingSelector())
+
+    assert agent.select_skill("make a spreadsheet") is skills[2]
+    assert "Respond with ONLY the number" in llm.prompts[0]
+
+
+def test_select_skill_uses_first_skill_when_numbered_reply_is_unusable():
+    skills = _skills("pdf", "xlsx")
+    agent = _agent_with(skills, _NumberingLLM("no idea"), _FailingSelector())
+
+    assert agent.select_skill("anything") is skills[0]
+
+
+def test_rediscovery_reloads_a_skill_body_after_its_scripts_change(tmp_path):
+    skill_dir = tmp_path / "skills" / "demo"
+    (skill_dir / "scripts").mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text("---\nname: demo\ndescription: Demo skill\n---\nUse the scripts.\n")
+    (skill_dir / "scripts" / "one.py").write_text("print(1)\n")
+
+    discovery = agentSmith.SkillDiscovery(str(tmp_path))
+    [demo] = discovery.find_skills()
+    assert demo.load_body().scripts_available == ["scripts/one.py"]
+
+    (skill_dir / "scripts" / "two.py").write_text("import numpy\n")
+    [rediscovered] = discovery.find_skills()
+    body = rediscovered.load_body()
+    assert body.scripts_available == ["scripts/one.py", "scripts/two.py"]
+    assert body.dependencies == ["numpy"]